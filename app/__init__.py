@@ -1,19 +1,23 @@
+import click
 from flask import Flask
-from .models import db, User
-import os
-from dotenv import load_dotenv
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-import certifi
-import ssl
-from datetime import datetime
+from .models import db, ensure_indexes
+from .db_manager import init_engine_profiles, configure_engines
 import os
 from .logger import log
 from .color_manager import assign_colors_to_existing_users
 from .slack_manager import set_first_admin
-from .user_manager import update_manager_leave_balances
+from .user_manager import reset_leave_balances, start_balance_reset_scheduler
+from .slack_delivery_manager import init_delivery_queue
+from .slack_directory_manager import start_directory_refresher
+from .metrics_manager import init_metrics
+from .analytics_manager import backfill_leave_rollups, rebuild_leave_rollups
+from .coverage_manager import backfill_team_coverage, rebuild_team_coverage
+from .digest_manager import send_pending_digests, start_digest_scheduler
+from .bulk_leave_manager import IMPORT_CHUNK_SIZE, detect_format, import_leaves, export_leaves
 
 def load_env(file_path):
+    if not os.path.exists(file_path):
+        return
     with open(file_path) as f:
         for line in f:
             if line.strip() and not line.startswith('#'):
@@ -23,34 +27,89 @@ def load_env(file_path):
 load_env('.env')
 slack_token = os.getenv("SLACK_BOT_TOKEN")
 
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-
-client = None
-
-def initialize_slack_client():
-    global client
-    if client is None:
-        client = WebClient(token=slack_token, ssl=ssl_context)
-        log.info("Slack client initialized once.")
+def bootstrap():
+    """One-shot setup: schema, indexes, analytics and coverage backfill, first admin (a Slack call), balance resets and colour backfill.
 
-initialize_slack_client()
+    Runs in create_app unless RUN_BOOTSTRAP_ON_STARTUP is off, in which case run `flask bootstrap` once per deploy.
+    """
+    try:
+        db.create_all()
+        log.info("Database tables created successfully.")
+        created_indexes = ensure_indexes()
+        if created_indexes:
+            log.info("Created missing indexes: %s", ", ".join(created_indexes))
+        backfill_leave_rollups()
+        backfill_team_coverage()
+        set_first_admin()
+        reset_leave_balances()
+    except Exception as e:
+        log.error(f"Error creating database tables: {e}")
+    assign_colors_to_existing_users()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config')
 
+    init_engine_profiles(app)
     db.init_app(app)
-    with app.app_context():
-        try:
-            db.create_all()
-            log.info("Database tables created successfully.")
-            set_first_admin(client)
-            update_manager_leave_balances()
-        except Exception as e:
-            log.error(f"Error creating database tables: {e}")
-        assign_colors_to_existing_users()
+    configure_engines(app, db)
+    if app.config.get('RUN_BOOTSTRAP_ON_STARTUP', True):
+        with app.app_context():
+            bootstrap()
+
+    init_delivery_queue(app)
+    init_metrics(app)
+    if not app.config.get('SLACK_VERIFY_SIGNATURES', True):
+        log.warning("SLACK_VERIFY_SIGNATURES is off; /slack/* requests are accepted without signature verification.")
+    elif not app.config.get('SLACK_SIGNING_SECRET'):
+        log.error("SLACK_SIGNING_SECRET is not set; every /slack/* request will be rejected.")
+    if app.config.get('DIRECTORY_REFRESH_INTERVAL'):
+        start_directory_refresher(app.config['DIRECTORY_REFRESH_INTERVAL'])
+    if app.config.get('BALANCE_RESET_INTERVAL'):
+        start_balance_reset_scheduler(app, app.config['BALANCE_RESET_INTERVAL'])
+    if app.config.get('DIGEST_INTERVAL'):
+        start_digest_scheduler(app, app.config['DIGEST_INTERVAL'])
+
+    @app.cli.command('bootstrap')
+    def bootstrap_command():
+        """Create tables and indexes, set the first admin, reset balances and backfill colours."""
+        bootstrap()
+
+    @app.cli.command('reset-balances')
+    def reset_balances_command():
+        """Reset stale intern (monthly) and manager (yearly) leave balances."""
+        touched = reset_leave_balances()
+        print(f"Reset {touched['Intern']} intern and {touched['Manager']} manager balances.")
+
+    @app.cli.command('send-digests')
+    def send_digests_command():
+        """Send every queued leave digest now, e.g. from cron when DIGEST_INTERVAL is 0."""
+        print(f"Sent {send_pending_digests()} leave requests in digests.")
+
+    @app.cli.command('rebuild-analytics')
+    def rebuild_analytics_command():
+        """Recompute the monthly leave rollups behind /api/analytics and the team coverage index from the leave table."""
+        print(f"Wrote {rebuild_leave_rollups()} rollup rows and {rebuild_team_coverage()} team day-off rows.")
+
+    @app.cli.command('import-leaves')
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help="Defaults to the file extension, else csv.")
+    @click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True)
+    def import_leaves_command(source, fmt, chunk_size):
+        """Bulk-load leave records (CSV or JSONL, '-' for stdin) without Slack notifications."""
+        def report(line_number, message):
+            click.echo(f"line {line_number}: {message}", err=True)
+        summary = import_leaves(source, fmt or detect_format(source.name), chunk_size, on_reject=report)
+        print(f"Imported {summary['imported']} leave requests, skipped {summary['skipped']} already imported, "
+              f"rejected {summary['rejected']}.")
+
+    @app.cli.command('export-leaves')
+    @click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help="Defaults to the file extension, else csv.")
+    def export_leaves_command(target, fmt):
+        """Stream every leave request to a CSV or JSONL file ('-' for stdout)."""
+        for text in export_leaves(fmt or detect_format(target.name)):
+            target.write(text)
 
     from . import routes
     app.register_blueprint(routes.bp)
@@ -0,0 +1,151 @@
+# app/analytics_manager.py
+import calendar
+from collections import Counter, defaultdict
+from datetime import date
+from .models import db, User, LeaveRequest, LeaveStatus, ManagerMapping, LeaveMonthlyRollup
+from .db_manager import dialect_insert
+from .business_day_manager import iter_business_days, count_business_days
+from .logger import log
+
+STATUS_COLUMNS = {
+    LeaveStatus.APPROVED: 'approved_days',
+    LeaveStatus.PENDING: 'pending_days',
+    LeaveStatus.DECLINED: 'declined_days',
+}
+MAX_ANALYTICS_MONTHS = 60
+
+def add_leave_transition(deltas, user_id, start_date, end_date, old_status, new_status):
+    """Adds one leave's move between statuses (None for a new leave) to `deltas`, keyed like the rollup table."""
+    old_column, new_column = STATUS_COLUMNS.get(old_status), STATUS_COLUMNS.get(new_status)
+    if old_column == new_column:
+        return deltas
+    for day in iter_business_days(start_date, end_date):
+        counts = deltas[(user_id, day.strftime('%Y-%m'), day.weekday())]
+        if old_column:
+            counts[old_column] -= 1
+        if new_column:
+            counts[new_column] += 1
+    return deltas
+
+def apply_rollup_deltas(deltas):
+    """Adds `deltas` to LeaveMonthlyRollup in the caller's transaction with one executemany upsert, however many keys
+    there are. Increments are done in SQL, so concurrent transitions add up even on a key neither has seen yet."""
+    if not deltas:
+        return
+    statement = dialect_insert(LeaveMonthlyRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[LeaveMonthlyRollup.user_id, LeaveMonthlyRollup.month, LeaveMonthlyRollup.weekday],
+        set_={
+            column: getattr(LeaveMonthlyRollup, column) + getattr(statement.excluded, column)
+            for column in STATUS_COLUMNS.values()
+        }
+    )
+    # Sorted so concurrent transactions lock rollup rows in the same order
+    db.session.execute(statement, [
+        {
+            'user_id': user_id, 'month': month, 'weekday': weekday,
+            **{column: counts[column] for column in STATUS_COLUMNS.values()},
+        }
+        for (user_id, month, weekday), counts in sorted(deltas.items())
+    ])
+
+def record_leave_transition(user_id, start_date, end_date, old_status, new_status):
+    """Keeps the rollup in step with one leave's status change. Runs inside the caller's transaction."""
+    apply_rollup_deltas(add_leave_transition(defaultdict(Counter), user_id, start_date, end_date, old_status, new_status))
+
+def rebuild_leave_rollups(chunk_size=5000):
+    """Recomputes LeaveMonthlyRollup from every LeaveRequest. Returns the number of rollup rows written."""
+    db.session.query(LeaveMonthlyRollup).delete(synchronize_session=False)
+    deltas = defaultdict(Counter)
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            LeaveRequest.id, LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status
+        ).filter(LeaveRequest.id > last_id).order_by(LeaveRequest.id).limit(chunk_size).all()
+        if not rows:
+            break
+        for row in rows:
+            add_leave_transition(deltas, row.user_id, row.start_date, row.end_date, None, row.status)
+        last_id = rows[-1].id
+    apply_rollup_deltas(deltas)
+    db.session.commit()
+    log.info("Rebuilt leave rollups: %s rows.", len(deltas))
+    return len(deltas)
+
+def backfill_leave_rollups():
+    """Builds the rollup once for databases that held leave before the table existed."""
+    if db.session.query(LeaveMonthlyRollup.user_id).first() or not db.session.query(LeaveRequest.id).first():
+        return 0
+    return rebuild_leave_rollups()
+
+def parse_month(value):
+    """Parses YYYY-MM into the first day of that month. Raises ValueError otherwise."""
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+def _month_starts(first, last):
+    month = first
+    while month <= last:
+        yield month
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def get_team_analytics(manager_id, first_month, last_month):
+    """Team utilisation per month, busiest weekdays and per-member totals and balances from the rollup table.
+
+    Reads O(team x months x 5) rollup rows and never touches LeaveRequest.
+    """
+    members = db.session.query(User.slack_id, User.name, User.leave_balance).join(
+        ManagerMapping, ManagerMapping.employee_id == User.slack_id
+    ).filter(ManagerMapping.manager_id == manager_id).order_by(User.name).all()
+    month_starts = list(_month_starts(first_month, last_month))
+    months = {start.strftime('%Y-%m'): Counter() for start in month_starts}
+    per_member = {member.slack_id: Counter() for member in members}
+    weekdays = Counter()
+    if members:
+        rollups = db.session.query(LeaveMonthlyRollup).filter(
+            LeaveMonthlyRollup.user_id.in_(per_member),
+            LeaveMonthlyRollup.month >= first_month.strftime('%Y-%m'),
+            LeaveMonthlyRollup.month <= last_month.strftime('%Y-%m')
+        )
+        for rollup in rollups:
+            counts = {column: getattr(rollup, column) for column in STATUS_COLUMNS.values()}
+            months[rollup.month].update(counts)
+            per_member[rollup.user_id].update(counts)
+            weekdays[rollup.weekday] += rollup.approved_days + rollup.pending_days
+
+    team_size = len(members)
+    month_rows = []
+    for start in month_starts:
+        key = start.strftime('%Y-%m')
+        business_days = count_business_days(start, start.replace(day=calendar.monthrange(start.year, start.month)[1]))
+        available = team_size * business_days
+        month_rows.append({
+            'month': key,
+            'business_days': business_days,
+            'approved_days': months[key]['approved_days'],
+            'pending_days': months[key]['pending_days'],
+            'declined_days': months[key]['declined_days'],
+            'utilisation': round(months[key]['approved_days'] / available, 4) if available else 0.0,
+        })
+    return {
+        'manager_id': manager_id,
+        'from': first_month.strftime('%Y-%m'),
+        'to': last_month.strftime('%Y-%m'),
+        'team_size': team_size,
+        'months': month_rows,
+        'busiest_weekdays': [
+            {'weekday': calendar.day_name[weekday], 'days': days}
+            for weekday, days in sorted(weekdays.items(), key=lambda item: (-item[1], item[0])) if days
+        ],
+        'members': [
+            {
+                'slack_id': member.slack_id,
+                'name': member.name,
+                'approved_days': per_member[member.slack_id]['approved_days'],
+                'pending_days': per_member[member.slack_id]['pending_days'],
+                'declined_days': per_member[member.slack_id]['declined_days'],
+                'leave_balance': member.leave_balance,
+            }
+            for member in members
+        ],
+    }
@@ -0,0 +1,171 @@
+# app/block_template_manager.py
+import json
+import re
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+_encode_template = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                                    default=lambda slot: f"__slot__:{slot.name}").encode
+_SLOT_PATTERN = re.compile(r'"__slot__:(\w+)"')
+
+class Raw(str):
+    """JSON text spliced into templates and sent to Slack as-is instead of being encoded again."""
+
+class Slot:
+    def __init__(self, name):
+        self.name = name
+
+class JSONTemplate:
+    """A Slack payload, view or block list serialised once at import; each Slot is filled per render.
+
+    Slot values are JSON-encoded, except Raw values (rendered templates, block lists), which are spliced in verbatim.
+    """
+
+    def __init__(self, value):
+        parts = _SLOT_PATTERN.split(_encode_template(value))
+        self.literals = parts[0::2]
+        self.slots = parts[1::2]
+
+    def render(self, **values):
+        pieces = [self.literals[0]]
+        for name, literal in zip(self.slots, self.literals[1:]):
+            value = values[name]
+            pieces.append(value if isinstance(value, Raw) else _encode(value))
+            pieces.append(literal)
+        return Raw(''.join(pieces))
+
+def block_list(*fragments):
+    """Concatenates rendered block lists ("[...]") into one, skipping empty ones."""
+    return Raw('[' + ','.join(fragment[1:-1] for fragment in fragments if len(fragment) > 2) + ']')
+
+def static_blocks(*blocks):
+    return JSONTemplate(list(blocks)).render()
+
+def plain_text(text, **extra):
+    return {"type": "plain_text", "text": text, **extra}
+
+def button(text, action_id, **extra):
+    return {"type": "button", "text": plain_text(text, emoji=True), "action_id": action_id, **extra}
+
+def section(text, block_id=None, text_type="mrkdwn"):
+    block = {"type": "section", "text": {"type": text_type, "text": text}}
+    if block_id:
+        block["block_id"] = block_id
+    return block
+
+# Home tab
+GREETING = static_blocks(section("Hello, How can I help you today?"), {"type": "divider"})
+HOME_INTERN_HEADER = block_list(GREETING, static_blocks(
+    {"type": "actions", "elements": [
+        button("Apply leave", "apply_leave", style="primary"),
+        button("View leave history", "view_leave_history"),
+    ]},
+    section("Pending Leaves", "pending_leaves_header", "plain_text"),
+))
+HOME_MANAGER_HEADER = block_list(GREETING, static_blocks(
+    {"type": "actions", "elements": [
+        button("Apply leave", "apply_leave", style="primary"),
+        button("View Users", "view_users", style="primary"),
+        button("View Users Leave History", "view_user_leave_history"),
+        button("View calendar", "view_calendar"),
+        button("View my leave history", "view_leave_history"),
+    ]},
+    section("Pending Leave Requests", "pending_leaves_header", "plain_text"),
+))
+MANAGER_OWN_LEAVES_HEADER = static_blocks(section("Your Pending Leaves", "manager_pending_leaves_header", "plain_text"))
+USER_NOT_FOUND = static_blocks(section("User not found.", "no_user_found", "plain_text"))
+NO_OWN_PENDING_LEAVES = static_blocks(section("You have no pending leave requests.", "no_pending_leaves", "plain_text"))
+NO_TEAM_PENDING_LEAVES = static_blocks(section("No pending leave requests found."))
+OWN_PENDING_LEAVE_ROW = JSONTemplate([{
+    **section(Slot("text"), Slot("block_id")),
+    "accessory": {"type": "button", "text": plain_text("Cancel"), "action_id": Slot("action_id"), "style": "danger"},
+}])
+TEAM_PENDING_LEAVE_ROW = JSONTemplate([
+    section(Slot("text"), Slot("block_id")),
+    {"type": "actions", "elements": [
+        {"type": "button", "text": plain_text("Approve"), "action_id": "approve", "value": Slot("leave_id")},
+        {"type": "button", "text": plain_text("Decline"), "action_id": "decline", "value": Slot("leave_id")},
+    ]},
+])
+VIEWS_PUBLISH_HOME = JSONTemplate({"user_id": Slot("user_id"), "view": {"type": "home", "blocks": Slot("blocks")}})
+
+# Manager notification and its in-place update once decided
+LEAVE_REQUEST_MESSAGE = JSONTemplate([section(Slot("text"), "section-identifier")])
+COVERAGE_SECTION = JSONTemplate([section(Slot("text"), "coverage-identifier")])
+LEAVE_REQUEST_ACTIONS = JSONTemplate([{"type": "actions", "block_id": "actions-identifier", "elements": [
+    button("Approve", "approve", value=Slot("leave_id")),
+    button("Decline", "decline", value=Slot("leave_id")),
+]}])
+CHAT_POST_MESSAGE = JSONTemplate({"channel": Slot("channel"), "text": Slot("text"), "blocks": Slot("blocks")})
+LEAVE_DECISION_BLOCKS = JSONTemplate([
+    section(Slot("text"), "section-identifier"),
+    section(Slot("status"), "status-identifier"),
+])
+CHAT_UPDATE = JSONTemplate({"channel": Slot("channel"), "ts": Slot("ts"), "text": Slot("text"), "blocks": Slot("blocks")})
+
+# Manager digest: one message listing several leave requests, each row decided (and re-rendered) on its own
+DIGEST_HEADER = JSONTemplate([section(Slot("text"), "digest-header"), {"type": "divider"}])
+DIGEST_PENDING_ROW = JSONTemplate([
+    section(Slot("text"), Slot("block_id")),
+    {"type": "actions", "block_id": Slot("actions_block_id"), "elements": [
+        button("Approve", "approve", value=Slot("leave_id")),
+        button("Decline", "decline", value=Slot("leave_id")),
+    ]},
+])
+DIGEST_DECIDED_ROW = JSONTemplate([section(Slot("text"), Slot("block_id"))])
+
+# Modals opened from handle_interactions
+APPLY_LEAVE_MODAL = JSONTemplate({
+    "type": "modal",
+    "callback_id": "apply_leave_modal",
+    "title": plain_text("Apply for Leave"),
+    "blocks": [
+        {"type": "input", "block_id": "start_date", "label": plain_text("Start Date"),
+         "element": {"type": "datepicker", "action_id": "start_date"}, "optional": False},
+        {"type": "input", "block_id": "end_date", "label": plain_text("End Date"),
+         "element": {"type": "datepicker", "action_id": "end_date"}, "optional": False},
+        {"type": "input", "block_id": "reason", "label": plain_text("Reason for Leave"),
+         "element": {"type": "plain_text_input", "multiline": True, "action_id": "reason"}, "optional": False},
+    ],
+    "submit": plain_text("Submit"),
+}).render()
+APPLY_LEAVE_RESULT_MODAL = JSONTemplate({
+    "type": "modal",
+    "callback_id": "apply_leave_modal",
+    "title": plain_text("Apply for Leave"),
+    "blocks": [section(Slot("text"))],
+})
+LEAVE_HISTORY_REQUEST_MODAL = JSONTemplate({
+    "type": "modal",
+    "callback_id": "intern_leave_history_request",
+    "title": plain_text("Leave History"),
+    "blocks": [{
+        "type": "input",
+        "block_id": "slack_id_block",
+        "label": plain_text("Enter User ID"),
+        "element": {"type": "plain_text_input", "action_id": "slack_id_input",
+                    "placeholder": plain_text("e.g., U07GHFFEHDH")},
+        "optional": False,
+    }],
+    "submit": plain_text("Submit"),
+    "close": plain_text("Cancel"),
+}).render()
+CALENDAR_MODAL = JSONTemplate({
+    "type": "modal",
+    "callback_id": "calendar_modal",
+    "title": plain_text("Leave Calendar"),
+    "blocks": [{
+        **section("Here is the leave calendar:", "calendar_block"),
+        "accessory": button("Open Calendar", "open_calendar", url=Slot("url")),
+    }],
+})
+ERROR_MODAL = JSONTemplate({
+    "type": "modal",
+    "callback_id": "error_modal",
+    "title": plain_text("Error"),
+    "blocks": [section(Slot("text"), "error_message", "plain_text")],
+})
+VIEWS_OPEN = JSONTemplate({"trigger_id": Slot("trigger_id"), "view": Slot("view")})
+VIEWS_UPDATE = JSONTemplate({"view_id": Slot("view_id"), "view": Slot("view")})
+
+def leave_decision_blocks(text, approved):
+    return LEAVE_DECISION_BLOCKS.render(text=text, status=f"*Status:* {'Approved' if approved else 'Declined'}")
@@ -0,0 +1,281 @@
+# app/bulk_leave_manager.py
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+from datetime import date
+from itertools import islice
+from .models import db, User, LeaveRequest, LeaveStatus, ManagerMapping
+from .intern import check_leave_dates, INTERN_MONTHLY_LEAVE_LIMIT
+from .color_manager import color_users
+from .calendar_manager import bump_leave_versions
+from .business_day_manager import count_business_days
+from .analytics_manager import add_leave_transition, apply_rollup_deltas
+from .coverage_manager import day_off_rows, add_days_off
+from .user_manager import INTERN_MONTHLY_BALANCE, reset_leave_balances, debit_leave_balance
+from .logger import log
+
+IMPORT_CHUNK_SIZE = 5000
+EXPORT_FIELDS = ['id', 'user_id', 'manager_id', 'start_date', 'end_date', 'reason', 'status', 'channel_id', 'message_ts']
+ACTIVE_STATUSES = (LeaveStatus.PENDING, LeaveStatus.APPROVED)
+MAX_REPORTED_ERRORS = 100
+
+def detect_format(filename, default='csv'):
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+def iter_records(lines, fmt):
+    """Yields (line_number, record, error) for each CSV row or JSONL line without reading ahead."""
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Each line must be a JSON object."
+            continue
+        yield line_number, record, None
+
+def _parse_status(value):
+    if not value:
+        return LeaveStatus.PENDING
+    value = str(value).strip().upper()
+    for status in LeaveStatus:
+        if value in (status.name, status.value.upper()):
+            return status
+    return None
+
+def _parse_record(record):
+    """Applies apply_leave's date rules to one record. Returns (leave, error)."""
+    user_id = str(record.get('user_id') or '').strip()
+    if not user_id:
+        return None, "user_id is required."
+    status = _parse_status(record.get('status'))
+    if status is None:
+        return None, f"Unknown status {record.get('status')!r}."
+    reason = str(record.get('reason') or '')
+    if len(reason) > 255:
+        return None, "Reason is longer than 255 characters."
+    try:
+        start_date, end_date, leave_days, error = check_leave_dates(
+            str(record.get('start_date') or '').strip(), str(record.get('end_date') or '').strip()
+        )
+    except ValueError as e:
+        return None, f"Invalid date format. Please use YYYY-MM-DD. Error: {e}"
+    if error:
+        return None, error
+    return {
+        'user_id': user_id,
+        'user_name': str(record.get('user_name') or '').strip(),
+        'manager_id': str(record.get('manager_id') or '').strip(),
+        'start_date': start_date,
+        'end_date': end_date,
+        'leave_days': leave_days,
+        'reason': reason,
+        'status': status,
+    }, None
+
+def _balance_period_start(role, today):
+    # Leave that ended before the current balance period was paid for by an earlier, since reset, balance
+    return date(today.year, 1, 1) if role == 'Manager' else today.replace(day=1)
+
+def _import_chunk(chunk, reject, skip):
+    parsed = []
+    for line_number, record, error in chunk:
+        if error is None:
+            leave, error = _parse_record(record)
+        if error:
+            reject(line_number, error)
+        else:
+            parsed.append((line_number, leave))
+    if not parsed:
+        return 0
+
+    user_ids = {leave['user_id'] for _, leave in parsed}
+    users = {
+        slack_id: [role, balance] for slack_id, role, balance in
+        db.session.query(User.slack_id, User.role, User.leave_balance).filter(User.slack_id.in_(user_ids))
+    }
+    # Like apply_leave, an unknown user becomes an Intern when the record names them
+    new_users = {}
+    for _, leave in parsed:
+        if leave['user_id'] not in users and leave['user_name'] and leave['user_id'] not in new_users:
+            new_users[leave['user_id']] = User(slack_id=leave['user_id'], name=leave['user_name'], role="Intern",
+                                               leave_balance=INTERN_MONTHLY_BALANCE)
+    if new_users:
+        db.session.add_all(new_users.values())
+        # No commit here: a chunk rolled back below must not leave its new users behind
+        color_users(new_users.values())
+        users.update((slack_id, ["Intern", INTERN_MONTHLY_BALANCE]) for slack_id in new_users)
+
+    mappings = dict(db.session.query(ManagerMapping.employee_id, ManagerMapping.manager_id)
+                    .filter(ManagerMapping.employee_id.in_(user_ids)))
+    named_managers = {leave['manager_id'] for _, leave in parsed if leave['manager_id']}
+    known_managers = {slack_id for (slack_id,) in
+                      db.session.query(User.slack_id).filter(User.slack_id.in_(named_managers))}
+
+    # Leave already stored for these users, wide enough for the overlap and per-month checks
+    window_start = min(leave['start_date'].replace(day=1) for _, leave in parsed)
+    window_end = max(leave['end_date'] for _, leave in parsed)
+    booked = defaultdict(list)
+    stored = set()
+    for user_id, start_date, end_date, status in db.session.query(
+        LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status
+    ).filter(
+        LeaveRequest.user_id.in_(user_ids),
+        LeaveRequest.end_date >= window_start,
+        LeaveRequest.start_date <= window_end
+    ):
+        stored.add((user_id, start_date, end_date, status))
+        if status in ACTIVE_STATUSES:
+            booked[user_id].append((start_date, end_date, count_business_days(start_date, end_date)))
+
+    today = date.today()
+    rows, debits, touched, accepted = [], Counter(), set(), []
+    rollup_deltas = defaultdict(Counter)
+    days_off = []
+    for line_number, leave in parsed:
+        user_id, start_date, end_date = leave['user_id'], leave['start_date'], leave['end_date']
+        # Exact repeats (an earlier run of the same file, or a repeated line) are skipped, so a re-run only adds what is new
+        key = (user_id, start_date, end_date, leave['status'])
+        if key in stored:
+            skip(line_number)
+            continue
+        user = users.get(user_id)
+        if user is None:
+            reject(line_number, "User not found.")
+            continue
+        manager_id = leave['manager_id'] or mappings.get(user_id)
+        if not manager_id or (leave['manager_id'] and manager_id not in known_managers):
+            reject(line_number, "Manager not found.")
+            continue
+        if leave['status'] in ACTIVE_STATUSES:
+            intervals = booked[user_id]
+            if any(start <= end_date and end >= start_date for start, end, _ in intervals):
+                reject(line_number, "You have already applied for leave on one or more of these dates.")
+                continue
+            if user[0] == 'Intern':
+                month_total = sum(days for start, _, days in intervals
+                                  if (start.year, start.month) == (start_date.year, start_date.month))
+                if month_total + leave['leave_days'] > INTERN_MONTHLY_LEAVE_LIMIT:
+                    reject(line_number, "Leave limit exceeded. You can only take a maximum of 2 days leave per month.")
+                    continue
+            if end_date >= _balance_period_start(user[0], today):
+                if user[1] < leave['leave_days']:
+                    reject(line_number, "Insufficient leave balance.")
+                    continue
+                user[1] -= leave['leave_days']
+                debits[user_id] += leave['leave_days']
+            intervals.append((start_date, end_date, leave['leave_days']))
+        rows.append({
+            'user_id': user_id,
+            'manager_id': manager_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'reason': leave['reason'],
+            'status': leave['status'],
+        })
+        add_leave_transition(rollup_deltas, user_id, start_date, end_date, None, leave['status'])
+        if leave['status'] in ACTIVE_STATUSES:
+            days_off.extend(day_off_rows(user_id, manager_id, start_date, end_date,
+                                         leave['status'] == LeaveStatus.APPROVED))
+        stored.add(key)
+        accepted.append(line_number)
+        touched.update((user_id, manager_id))
+
+    if not rows:
+        return 0
+    db.session.bulk_insert_mappings(LeaveRequest, rows)
+    for user_id, days in debits.items():
+        # Conditional, so a leave applied through Slack while this chunk was validated cannot overdraw the balance
+        if not debit_leave_balance(user_id, days):
+            db.session.rollback()
+            for line_number in accepted:
+                reject(line_number, "Leave balance changed during import; chunk skipped, re-run to retry.")
+            return 0
+    apply_rollup_deltas(rollup_deltas)
+    add_days_off(days_off)
+    bump_leave_versions(*touched)
+    db.session.commit()
+    return len(rows)
+
+def import_leaves(lines, fmt='csv', chunk_size=IMPORT_CHUNK_SIZE, on_reject=None):
+    """Streams leave records from `lines` (CSV with a header row, or JSONL) into LeaveRequest in chunks.
+
+    Records are checked with apply_leave's rules and inserted without Slack notifications; each chunk commits on its own.
+    Records matching a stored leave on user, dates and status are skipped, so re-running a partly imported file is safe.
+    Returns {'imported', 'skipped', 'rejected', 'errors'}; only the first MAX_REPORTED_ERRORS rejections are kept, pass
+    `on_reject(line_number, message)` to see all of them.
+    """
+    summary = {'imported': 0, 'skipped': 0, 'rejected': 0, 'errors': []}
+
+    def skip(line_number):
+        summary['skipped'] += 1
+
+    def reject(line_number, message):
+        summary['rejected'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line_number, 'error': message})
+        if on_reject:
+            on_reject(line_number, message)
+
+    reset_leave_balances()
+    records = iter_records(lines, fmt)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        try:
+            summary['imported'] += _import_chunk(chunk, reject, skip)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.expunge_all()
+    log.info("Leave import finished: %s imported, %s skipped, %s rejected.",
+             summary['imported'], summary['skipped'], summary['rejected'])
+    return summary
+
+def iter_leave_chunks(chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields every LeaveRequest as plain rows, keyset-paginated by id so memory stays flat."""
+    columns = [getattr(LeaveRequest, field) for field in EXPORT_FIELDS]
+    last_id = 0
+    while True:
+        rows = db.session.query(*columns).filter(LeaveRequest.id > last_id).order_by(LeaveRequest.id).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+def export_leaves(fmt='csv', chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields the LeaveRequest table as CSV or JSONL text, one chunk at a time. The output re-imports with import_leaves."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(EXPORT_FIELDS)
+    for rows in iter_leave_chunks(chunk_size):
+        for row in rows:
+            record = dict(zip(EXPORT_FIELDS, row))
+            record['start_date'] = row.start_date.isoformat()
+            record['end_date'] = row.end_date.isoformat()
+            record['status'] = row.status.value
+            if fmt == 'csv':
+                writer.writerow([record[field] for field in EXPORT_FIELDS])
+            else:
+                buffer.write(json.dumps(record) + '\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if fmt == 'csv' and buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,97 @@
+# app/business_day_manager.py
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from .logger import log
+
+# date(1, 1, 1) is a Monday, so (ordinal - 1) % 7 is the weekday
+_holidays = None
+_holidays_lock = threading.Lock()
+
+def load_holidays(file_path=None):
+    """Reads company holidays (one YYYY-MM-DD per line, optional name after it, # for comments).
+
+    Only holidays falling on weekdays are kept, as sorted ordinals for bisect lookups. The file defaults to the
+    app's HOLIDAYS_FILE setting (the environment variable outside an app context, e.g. in scripts).
+    """
+    global _holidays
+    if file_path is None:
+        if has_app_context():
+            file_path = current_app.config.get('HOLIDAYS_FILE', 'holidays.txt')
+        else:
+            file_path = os.getenv("HOLIDAYS_FILE", "holidays.txt")
+    holidays = set()
+    if os.path.exists(file_path):
+        with open(file_path) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                day = datetime.strptime(line.split()[0], "%Y-%m-%d").date()
+                if day.weekday() < 5:
+                    holidays.add(day.toordinal())
+        log.info("Loaded %s weekday holidays from %s.", len(holidays), file_path)
+    with _holidays_lock:
+        _holidays = sorted(holidays)
+    return _holidays
+
+def get_holidays():
+    if _holidays is None:
+        return load_holidays()
+    return _holidays
+
+def _weekdays_before(ordinal):
+    days = ordinal - 1
+    return (days // 7) * 5 + min(days % 7, 5)
+
+def is_business_day(day):
+    if day.weekday() >= 5:
+        return False
+    holidays = get_holidays()
+    index = bisect_left(holidays, day.toordinal())
+    return not (index < len(holidays) and holidays[index] == day.toordinal())
+
+def count_business_days(start_date, end_date):
+    """Counts working days in [start_date, end_date] in O(log holidays)."""
+    if end_date < start_date:
+        return 0
+    start, end = start_date.toordinal(), end_date.toordinal()
+    holidays = get_holidays()
+    holiday_count = bisect_right(holidays, end) - bisect_left(holidays, start)
+    return _weekdays_before(end + 1) - _weekdays_before(start) - holiday_count
+
+def count_business_days_many(ranges):
+    """Scores many (start_date, end_date) ranges at once for reports.
+
+    Builds one cumulative working-day table over the span the ranges cover, then answers each range with two lookups.
+    """
+    ranges = list(ranges)
+    if not ranges:
+        return []
+    first = min(start.toordinal() for start, _ in ranges)
+    last = max(end.toordinal() for _, end in ranges)
+    holidays = get_holidays()
+    holiday_index = bisect_left(holidays, first)
+    cumulative = [0] * (last - first + 2)
+    running = 0
+    for offset, ordinal in enumerate(range(first, last + 1), start=1):
+        while holiday_index < len(holidays) and holidays[holiday_index] < ordinal:
+            holiday_index += 1
+        is_holiday = holiday_index < len(holidays) and holidays[holiday_index] == ordinal
+        if (ordinal - 1) % 7 < 5 and not is_holiday:
+            running += 1
+        cumulative[offset] = running
+    return [
+        cumulative[end.toordinal() - first + 1] - cumulative[start.toordinal() - first] if end >= start else 0
+        for start, end in ranges
+    ]
+
+def iter_business_days(start_date, end_date):
+    """Yields each working day in [start_date, end_date]."""
+    day = start_date
+    while day <= end_date:
+        if is_business_day(day):
+            yield day
+        day += timedelta(days=1)
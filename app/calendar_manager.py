@@ -0,0 +1,28 @@
+# app/calendar_manager.py
+from datetime import datetime
+from .models import db, LeaveVersion
+from .db_manager import dialect_insert
+
+def bump_leave_versions(*slack_ids):
+    """Marks the calendars of the given users as changed. Runs inside the caller's transaction."""
+    slack_ids = sorted(set(filter(None, slack_ids)))
+    if not slack_ids:
+        return
+    # One upsert, so two first-time bumps of the same user cannot both insert its row; sorted to lock in one order
+    statement = dialect_insert(LeaveVersion).values([{'slack_id': slack_id, 'version': 1} for slack_id in slack_ids])
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[LeaveVersion.slack_id], set_={'version': LeaveVersion.version + 1}
+    ))
+
+def get_leave_version(slack_id):
+    version = db.session.query(LeaveVersion.version).filter_by(slack_id=slack_id).scalar()
+    return version or 0
+
+def parse_calendar_bound(value):
+    """Parses a FullCalendar start/end parameter (ISO date or datetime) into a date."""
+    if not value:
+        return None
+    return datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+def leave_events_etag(slack_id, version, start, end):
+    return f'{slack_id}-{version}-{start or ""}-{end or ""}'
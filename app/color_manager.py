@@ -1,26 +1,61 @@
-from .models import db, User
-import random
+from .models import db, User, AppCounter
+from .db_manager import dialect_insert
+import colorsys
 from .logger import log
 
-def generate_unique_color(existing_colors):
-    excluded_color = "#808080"
-    while True:
-        color = "#{:06x}".format(random.randint(0, 0xFFFFFF))
-        if color not in existing_colors and color != excluded_color:
-            return color
+GOLDEN_RATIO_CONJUGATE = 0.618033988749895
+# Lightness and saturation follow the R2 low-discrepancy sequence (https://extremelearning.com.au/unreasonable-effectiveness-of-quasirandom-sequences/)
+PLASTIC_NUMBER = 1.324717957244746
+EXCLUDED_COLOR = "#808080"  # Reserved for pending leaves on the calendar
+
+def color_for_index(index):
+    """Deterministic colour for the index-th user: golden-ratio hue steps, with tone varied so near-equal hues stay apart."""
+    hue = (index * GOLDEN_RATIO_CONJUGATE) % 1.0
+    lightness = 0.32 + 0.40 * ((0.5 + index / PLASTIC_NUMBER) % 1.0)
+    saturation = 0.50 + 0.45 * ((0.5 + index / PLASTIC_NUMBER ** 2) % 1.0)
+    red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+    return "#{:02x}{:02x}{:02x}".format(round(red * 255), round(green * 255), round(blue * 255))
+
+def reserve_color_indexes(count):
+    """Reserves `count` consecutive colour indexes from the persisted counter, inside the caller's transaction."""
+    # An upsert, so two first-time callers cannot both insert the counter row
+    db.session.execute(dialect_insert(AppCounter).values(name='color', value=count).on_conflict_do_update(
+        index_elements=[AppCounter.name], set_={'value': AppCounter.value + count}
+    ))
+    end = db.session.query(AppCounter.value).filter_by(name='color').scalar()
+    return range(end - count, end)
+
+def allocate_colors(count):
+    """Returns `count` unused colours, skipping any already taken (e.g. random colours from older releases)."""
+    colors = []
+    while len(colors) < count:
+        candidates = [color_for_index(index) for index in reserve_color_indexes(count - len(colors))]
+        taken = {color for (color,) in db.session.query(User.color).filter(User.color.in_(candidates))}
+        taken.add(EXCLUDED_COLOR)
+        taken.update(colors)
+        colors.extend(color for color in dict.fromkeys(candidates) if color not in taken)
+    return colors
 
 def assign_color_to_user(user):
-    existing_colors = set(user.color for user in User.query.filter(User.color.isnot(None)).all())
-    user.color = generate_unique_color(existing_colors)
+    user.color = allocate_colors(1)[0]
     db.session.commit()
 
-def assign_colors_to_existing_users():
-    users = User.query.filter(User.color.is_(None)).all()
-    existing_colors = set(user.color for user in User.query.filter(User.color.isnot(None)).all())
+def color_users(users):
+    """Colours every given user inside the caller's transaction, without committing."""
+    users = list(users)
+    if users:
+        for user, color in zip(users, allocate_colors(len(users))):
+            user.color = color
+        db.session.flush()
+    return len(users)
 
-    for user in users:
-        user.color = generate_unique_color(existing_colors)
-        existing_colors.add(user.color)
+def assign_colors(users):
+    """Colours every given user in one transaction."""
+    colored = color_users(users)
+    if colored:
         db.session.commit()
+    return colored
 
-    log.info("Assigned unique colors to existing users.")
\ No newline at end of file
+def assign_colors_to_existing_users():
+    assigned = assign_colors(User.query.filter(User.color.is_(None)).all())
+    log.info("Assigned unique colors to %s existing users.", assigned)
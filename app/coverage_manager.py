@@ -0,0 +1,121 @@
+# app/coverage_manager.py
+from collections import defaultdict
+from flask import current_app
+from .models import db, User, LeaveRequest, LeaveStatus, ManagerMapping, TeamDayOff
+from .business_day_manager import iter_business_days
+from .logger import log
+
+MAX_COVERAGE_LINES = 10
+
+def day_off_rows(user_id, manager_id, start_date, end_date, approved):
+    return [
+        {'manager_id': manager_id, 'day': day, 'user_id': user_id, 'approved': approved}
+        for day in iter_business_days(start_date, end_date)
+    ]
+
+def add_days_off(rows):
+    if rows:
+        db.session.execute(TeamDayOff.__table__.insert(), rows)
+
+def record_coverage_transition(user_id, manager_id, start_date, end_date, new_status):
+    """Keeps TeamDayOff in step with a leave entering `new_status`. Runs inside the caller's transaction."""
+    if new_status == LeaveStatus.PENDING:
+        add_days_off(day_off_rows(user_id, manager_id, start_date, end_date, False))
+        return
+    days = TeamDayOff.query.filter(
+        TeamDayOff.manager_id == manager_id,
+        TeamDayOff.day >= start_date,
+        TeamDayOff.day <= end_date,
+        TeamDayOff.user_id == user_id
+    )
+    if new_status == LeaveStatus.APPROVED:
+        days.update({TeamDayOff.approved: True}, synchronize_session=False)
+    else:
+        days.delete(synchronize_session=False)
+
+def rebuild_team_coverage(chunk_size=5000):
+    """Recomputes TeamDayOff from every pending and approved LeaveRequest. Returns the number of rows written."""
+    db.session.query(TeamDayOff).delete(synchronize_session=False)
+    written = 0
+    last_id = 0
+    while True:
+        leaves = db.session.query(
+            LeaveRequest.id, LeaveRequest.user_id, LeaveRequest.manager_id,
+            LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status
+        ).filter(
+            LeaveRequest.id > last_id,
+            LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED])
+        ).order_by(LeaveRequest.id).limit(chunk_size).all()
+        if not leaves:
+            break
+        rows = []
+        for leave in leaves:
+            rows.extend(day_off_rows(leave.user_id, leave.manager_id, leave.start_date, leave.end_date,
+                                     leave.status == LeaveStatus.APPROVED))
+        add_days_off(rows)
+        written += len(rows)
+        last_id = leaves[-1].id
+    db.session.commit()
+    log.info("Rebuilt team coverage index: %s rows.", written)
+    return written
+
+def backfill_team_coverage():
+    """Builds the index once for databases that held leave before the table existed."""
+    if db.session.query(TeamDayOff.user_id).first() or not db.session.query(LeaveRequest.id).filter(
+        LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED])
+    ).first():
+        return 0
+    return rebuild_team_coverage()
+
+def who_is_off(manager_id, start_date, end_date):
+    """Maps each day in [start_date, end_date] with someone off to [(user_id, name, approved)]; one range scan."""
+    off = defaultdict(list)
+    rows = db.session.query(TeamDayOff.day, TeamDayOff.user_id, User.name, TeamDayOff.approved).join(
+        User, User.slack_id == TeamDayOff.user_id
+    ).filter(
+        TeamDayOff.manager_id == manager_id,
+        TeamDayOff.day >= start_date,
+        TeamDayOff.day <= end_date
+    ).order_by(TeamDayOff.day, User.name)
+    for day, user_id, name, approved in rows:
+        off[day].append((user_id, name, approved))
+    return off
+
+def get_coverage_report(leave_request, minimum=None):
+    """Who else on the team is off during `leave_request`, and the days approving it would leave fewer than
+    `minimum` (MIN_TEAM_ON_DUTY) members on duty. Only approved leave counts against coverage."""
+    if minimum is None:
+        minimum = current_app.config.get('MIN_TEAM_ON_DUTY', 1)
+    team_size = ManagerMapping.query.filter_by(manager_id=leave_request.manager_id).count()
+    off = who_is_off(leave_request.manager_id, leave_request.start_date, leave_request.end_date)
+    days = []
+    for day in iter_business_days(leave_request.start_date, leave_request.end_date):
+        others = [entry for entry in off.get(day, []) if entry[0] != leave_request.user_id]
+        approved = [name for _, name, is_approved in others if is_approved]
+        days.append({
+            'day': day,
+            'approved': approved,
+            'pending': [name for _, name, is_approved in others if not is_approved],
+            'on_duty': team_size - len(approved) - 1,
+        })
+    return {
+        'team_size': team_size,
+        'minimum': minimum,
+        'days': days,
+        'short_days': [entry['day'] for entry in days if entry['on_duty'] < minimum],
+    }
+
+def format_coverage_report(report):
+    lines = [f"*Team coverage* (team of {report['team_size']}, at least {report['minimum']} on duty)"]
+    busy = [entry for entry in report['days'] if entry['approved'] or entry['pending']]
+    if not busy:
+        lines.append("Nobody else on the team is off on these dates.")
+    for entry in busy[:MAX_COVERAGE_LINES]:
+        names = entry['approved'] + [f"{name} (pending)" for name in entry['pending']]
+        lines.append(f"• {entry['day']}: {', '.join(names)} off, {max(entry['on_duty'], 0)} on duty if approved")
+    if len(busy) > MAX_COVERAGE_LINES:
+        lines.append(f"• …and {len(busy) - MAX_COVERAGE_LINES} more days with others off")
+    if report['short_days']:
+        shown = ", ".join(str(day) for day in report['short_days'][:MAX_COVERAGE_LINES])
+        lines.append(f":warning: Approving leaves fewer than {report['minimum']} on duty on {shown}.")
+    return "\n".join(lines)
@@ -0,0 +1,128 @@
+# app/db_manager.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql import Select
+from .logger import log
+
+REPLICA_BIND = 'replica'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to the read replica inside a read_replica() block; everything else goes to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing and isinstance(clause, Select):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def is_memory_sqlite(url):
+    return url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url
+
+def engine_options_for(url, config):
+    """Engine keyword arguments for the database behind `url`, sized from the DB_* / SQLITE_* settings."""
+    pool = {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+    }
+    if url.startswith('sqlite'):
+        # The pysqlite timeout is its busy handler: writers queue for the lock instead of failing with "database is locked"
+        options = {'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000}}
+        # In-memory databases live on one shared connection (StaticPool), which takes no sizing
+        if not is_memory_sqlite(url):
+            options.update(pool)
+        return options
+    return {**pool, 'pool_recycle': config.get('DB_POOL_RECYCLE', 1800), 'pool_pre_ping': True}
+
+def init_engine_profiles(app):
+    """Fills SQLALCHEMY_ENGINE_OPTIONS and the replica bind from the profile for each URL. Call before db.init_app.
+
+    Explicit SQLALCHEMY_ENGINE_OPTIONS or SQLALCHEMY_BINDS entries are left alone.
+    """
+    config = app.config
+    url = config['SQLALCHEMY_DATABASE_URI']
+    if not config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_for(url, config)
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    if replica_url and REPLICA_BIND not in binds:
+        binds[REPLICA_BIND] = {'url': replica_url, **engine_options_for(replica_url, config)}
+        config['SQLALCHEMY_BINDS'] = binds
+
+def configure_engines(app, db):
+    """Applies SQLite pragmas on every new connection of each SQLite engine. Call after db.init_app."""
+    with app.app_context():
+        engines = dict(db.engines)
+    for key, engine in engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        pragmas = [
+            f"PRAGMA journal_mode={app.config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+            f"PRAGMA synchronous={app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+            f"PRAGMA busy_timeout={int(app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+
+        def apply_pragmas(dbapi_connection, connection_record, pragmas=pragmas):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+        event.listen(engine, 'connect', apply_pragmas)
+        log.info("SQLite pragmas for %s: %s", key or 'primary', "; ".join(pragmas))
+
+def dialect_insert(model):
+    """insert() for the primary database's dialect, which adds on_conflict_do_nothing / on_conflict_do_update.
+
+    Upserts let concurrent transactions create a row that may not exist yet without racing to an IntegrityError.
+    """
+    from .models import db
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+def has_replica(db):
+    return REPLICA_BIND in db.engines
+
+def _replica_version(db, slack_id):
+    from .models import LeaveVersion
+    with db.engines[REPLICA_BIND].connect() as connection:
+        version = connection.execute(select(LeaveVersion.version).where(LeaveVersion.slack_id == slack_id)).scalar()
+    return version or 0
+
+@contextmanager
+def read_replica(slack_id=None, version=None):
+    """Routes the block's SELECTs to the read replica when one is configured.
+
+    With `slack_id`, reads stay on the primary until the replica has caught up to that user's leave version
+    (`version`, looked up on the primary when omitted), so nothing rendered or cached under it is stale.
+    Yields whether the replica is used.
+    """
+    from .models import db
+    route = False
+    if has_replica(db):
+        try:
+            if slack_id is None:
+                route = True
+            else:
+                if version is None:
+                    from .calendar_manager import get_leave_version
+                    version = get_leave_version(slack_id)
+                route = _replica_version(db, slack_id) >= version
+        except Exception as e:
+            log.warning(f"Read replica unavailable, reading from primary: {e}")
+    token = _use_replica.set(route)
+    try:
+        yield route
+    finally:
+        _use_replica.reset(token)
@@ -0,0 +1,226 @@
+# app/digest_manager.py
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from .models import db, LeaveRequest, LeaveStatus, ManagerDigest, DigestEntry
+from .slack_http_manager import slack_post
+from .slack_delivery_manager import enqueue_delivery
+from .slack_message_manager import send_message_to_manager, update_message, update_message_for_manager
+from .business_day_manager import count_business_days
+from .block_template_manager import (
+    CHAT_POST_MESSAGE, DIGEST_DECIDED_ROW, DIGEST_HEADER, DIGEST_PENDING_ROW, block_list, leave_decision_blocks
+)
+from .logger import log
+
+# A message holds at most 50 blocks: the two-block header plus two per request
+DIGEST_MAX_ROWS = 24
+
+# A stale render can still reach Slack last when it comes from another worker
+DIGEST_UPDATE_ATTEMPTS = 3
+
+# Striped by (channel_id, message_ts) so concurrent decisions in one process re-render a digest message in order.
+# They do not span workers; update_digest_message re-checks after posting for that
+_message_locks = [threading.Lock() for _ in range(64)]
+
+def is_digest_enabled(manager_id):
+    return db.session.get(ManagerDigest, manager_id) is not None
+
+def set_digest_mode(manager_id, enabled):
+    """Turns digest mode on or off for a manager. Turning it off flushes whatever is still queued."""
+    digest = db.session.get(ManagerDigest, manager_id)
+    if enabled and digest is None:
+        db.session.add(ManagerDigest(manager_id=manager_id))
+    elif not enabled and digest is not None:
+        db.session.delete(digest)
+    db.session.commit()
+    if not enabled:
+        enqueue_delivery(send_manager_digest, manager_id)
+
+def notify_manager(manager_id, leave_id, message):
+    """Tells the manager about a new leave request: right away, or via their digest when digest mode is on."""
+    if not is_digest_enabled(manager_id):
+        enqueue_delivery(send_message_to_manager, manager_id, leave_id, message)
+        return
+    db.session.add(DigestEntry(leave_id=leave_id, manager_id=manager_id))
+    db.session.commit()
+    queued = DigestEntry.query.filter_by(manager_id=manager_id, batch=None).count()
+    # DIGEST_MAX_SIZE queued requests send a digest before the next scheduled one
+    if queued >= current_app.config.get('DIGEST_MAX_SIZE', 10):
+        enqueue_delivery(send_manager_digest, manager_id)
+
+def digest_row_text(leave):
+    days = count_business_days(leave.start_date, leave.end_date)
+    text = (f"*{leave.user.name}*: {leave.start_date} to {leave.end_date} "
+            f"({days} business day{'s' if days != 1 else ''})\n*Reason:* {leave.reason}")
+    if leave.status != LeaveStatus.PENDING:
+        text += f"\n*Status:* {leave.status.value}"
+    return text
+
+def render_digest(leaves):
+    """Returns (text, blocks) for a digest message listing `leaves`; decided rows lose their buttons."""
+    pending = sum(1 for leave in leaves if leave.status == LeaveStatus.PENDING)
+    text = (f"{pending} of {len(leaves)} leave requests in this digest are waiting for your decision."
+            if pending else f"All {len(leaves)} leave requests in this digest have been handled.")
+    rows = []
+    for leave in leaves:
+        if leave.status == LeaveStatus.PENDING:
+            rows.append(DIGEST_PENDING_ROW.render(
+                text=digest_row_text(leave), block_id=f"digest_leave_{leave.id}",
+                actions_block_id=f"digest_actions_{leave.id}", leave_id=str(leave.id)
+            ))
+        else:
+            rows.append(DIGEST_DECIDED_ROW.render(text=digest_row_text(leave), block_id=f"digest_leave_{leave.id}"))
+    return text, block_list(DIGEST_HEADER.render(text=text), *rows)
+
+def stale_claim_cutoff():
+    return datetime.now() - timedelta(seconds=current_app.config.get('DIGEST_CLAIM_TIMEOUT', 600))
+
+def claim_digest_batch(manager_id):
+    """Marks up to DIGEST_MAX_ROWS queued entries as one batch. Returns its token, or None when nothing is queued.
+
+    The conditional UPDATE lets the scheduler, the size trigger and other workers race without sending a request twice.
+    Batches whose sender died before posting them are put back in the queue first.
+    """
+    DigestEntry.query.filter(
+        DigestEntry.manager_id == manager_id, DigestEntry.claimed_at < stale_claim_cutoff()
+    ).update({DigestEntry.batch: None, DigestEntry.claimed_at: None}, synchronize_session=False)
+    leave_ids = [leave_id for (leave_id,) in db.session.query(DigestEntry.leave_id).filter_by(
+        manager_id=manager_id, batch=None
+    ).order_by(DigestEntry.leave_id).limit(DIGEST_MAX_ROWS)]
+    if not leave_ids:
+        db.session.commit()
+        return None
+    token = uuid.uuid4().hex
+    DigestEntry.query.filter(DigestEntry.leave_id.in_(leave_ids), DigestEntry.batch.is_(None)).update(
+        {DigestEntry.batch: token, DigestEntry.claimed_at: datetime.now()}, synchronize_session=False
+    )
+    db.session.commit()
+    return token
+
+def send_manager_digest(manager_id):
+    """Posts the manager's queued leave requests as digest messages. Returns the number of requests sent."""
+    sent = 0
+    while True:
+        token = claim_digest_batch(manager_id)
+        if token is None:
+            return sent
+        leaves = LeaveRequest.query.options(joinedload(LeaveRequest.user)).join(
+            DigestEntry, DigestEntry.leave_id == LeaveRequest.id
+        ).filter(DigestEntry.batch == token).order_by(LeaveRequest.start_date, LeaveRequest.id).all()
+        # Requests cancelled or decided (e.g. from the home tab) while queued need no digest row
+        settled = [leave.id for leave in leaves if leave.status != LeaveStatus.PENDING]
+        if settled:
+            DigestEntry.query.filter(DigestEntry.leave_id.in_(settled)).delete(synchronize_session=False)
+            db.session.commit()
+        leaves = [leave for leave in leaves if leave.status == LeaveStatus.PENDING]
+        if not leaves:
+            continue
+        text, blocks = render_digest(leaves)
+        try:
+            response = slack_post('chat.postMessage', CHAT_POST_MESSAGE.render(channel=manager_id, text=text, blocks=blocks))
+            response.raise_for_status()
+            response_data = response.json()
+            if not response_data.get("ok"):
+                raise Exception(f"Slack API Error: {response_data.get('error')}")
+        except Exception as e:
+            # Back in the queue for the next digest
+            DigestEntry.query.filter_by(batch=token).update(
+                {DigestEntry.batch: None, DigestEntry.claimed_at: None}, synchronize_session=False
+            )
+            db.session.commit()
+            log.error(f"Error sending leave digest to {manager_id}: {e}")
+            raise
+        LeaveRequest.query.filter(LeaveRequest.id.in_([leave.id for leave in leaves])).update({
+            LeaveRequest.channel_id: response_data.get('channel'),
+            LeaveRequest.message_ts: response_data.get('ts')
+        }, synchronize_session=False)
+        DigestEntry.query.filter_by(batch=token).update({DigestEntry.claimed_at: None}, synchronize_session=False)
+        ManagerDigest.query.filter_by(manager_id=manager_id).update(
+            {ManagerDigest.last_sent_at: datetime.now()}, synchronize_session=False
+        )
+        db.session.commit()
+        log.info("Leave digest with %s requests sent to %s", len(leaves), manager_id)
+        sent += len(leaves)
+
+def send_pending_digests():
+    """Sends a digest to every manager with queued leave requests. Returns the number of requests sent."""
+    manager_ids = [manager_id for (manager_id,) in db.session.query(DigestEntry.manager_id).filter(
+        or_(DigestEntry.batch.is_(None), DigestEntry.claimed_at < stale_claim_cutoff())
+    ).distinct()]
+    sent = 0
+    for manager_id in manager_ids:
+        try:
+            sent += send_manager_digest(manager_id)
+        except Exception:
+            db.session.rollback()
+    return sent
+
+def start_digest_scheduler(app, interval):
+    """Runs send_pending_digests every `interval` seconds on a daemon thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    send_pending_digests()
+                except Exception as e:
+                    log.error(f"Leave digest run failed: {e}")
+
+    threading.Thread(target=run, name="leave-digest", daemon=True).start()
+    return stop
+
+def in_sent_digest(leave_id):
+    return db.session.query(DigestEntry.batch).filter_by(leave_id=leave_id).scalar() is not None
+
+def digest_message_leaves(channel_id, message_ts):
+    # Ends the read transaction first, so each call sees decisions other workers committed since the last one
+    db.session.commit()
+    return LeaveRequest.query.options(joinedload(LeaveRequest.user)).join(
+        DigestEntry, DigestEntry.leave_id == LeaveRequest.id
+    ).filter(
+        LeaveRequest.channel_id == channel_id,
+        LeaveRequest.message_ts == message_ts
+    ).order_by(LeaveRequest.start_date, LeaveRequest.id).all()
+
+def update_digest_message(channel_id, message_ts):
+    """Re-renders a digest message in place from the current status of every request it lists.
+
+    Another worker may render an older state and post it after ours, so the statuses are read again once
+    Slack has answered; if they moved on, the message is rendered and posted again. Whichever post lands last
+    is therefore checked by its sender against the newest committed state.
+    """
+    with _message_locks[hash((channel_id, message_ts)) % len(_message_locks)]:
+        leaves = digest_message_leaves(channel_id, message_ts)
+        for _ in range(DIGEST_UPDATE_ATTEMPTS):
+            text, blocks = render_digest(leaves)
+            rendered = [(leave.id, leave.status) for leave in leaves]
+            response = update_message(channel_id, message_ts, text, blocks)
+            leaves = digest_message_leaves(channel_id, message_ts)
+            if [(leave.id, leave.status) for leave in leaves] == rendered:
+                return response
+        log.warning("Digest message %s/%s still changing after %s updates.", channel_id, message_ts, DIGEST_UPDATE_ATTEMPTS)
+        return response
+
+def enqueue_decision_update(leave_id, channel_id, message_ts, updated_text, approved):
+    """Queues the in-place update of the message a decided request was announced in: its own, or its digest row."""
+    # Still queued for a digest (or its notification failed): there is no message yet, and the digest drops settled rows
+    if not channel_id or not message_ts:
+        log.info("No manager message to update for leave %s.", leave_id)
+        return
+    if in_sent_digest(leave_id):
+        enqueue_delivery(update_digest_message, channel_id, message_ts)
+    else:
+        enqueue_delivery(update_message, channel_id, message_ts, updated_text, leave_decision_blocks(updated_text, approved))
+
+def enqueue_cancel_update(leave_request, user_name):
+    if not leave_request.channel_id or not leave_request.message_ts:
+        log.info("No manager message to update for leave %s.", leave_request.id)
+        return
+    if in_sent_digest(leave_request.id):
+        enqueue_delivery(update_digest_message, leave_request.channel_id, leave_request.message_ts)
+    else:
+        enqueue_delivery(update_message_for_manager, leave_request.channel_id, leave_request.message_ts, user_name)
@@ -0,0 +1,35 @@
+# app/history_manager.py
+import os
+from datetime import datetime
+from sqlalchemy import or_, and_
+from .models import LeaveRequest
+from .db_manager import read_replica
+
+# A modal holds at most 100 blocks and a message 50; one block per entry plus headers must fit either
+HISTORY_PAGE_SIZE = min(int(os.getenv("LEAVE_HISTORY_PAGE_SIZE", "20")), 40)
+
+def encode_history_cursor(leave):
+    return f"{leave.start_date.isoformat()}:{leave.id}"
+
+def decode_history_cursor(cursor):
+    """Inverse of encode_history_cursor. Raises ValueError on anything else."""
+    start_date, leave_id = cursor.strip().split(':')
+    return datetime.strptime(start_date, "%Y-%m-%d").date(), int(leave_id)
+
+def get_leave_history_page(user_id, cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """Returns one newest-first page of a user's leave requests and the cursor of the next page (None on the last).
+
+    Keyset-paginated on (start_date, id) over ix_leave_request_user_dates, so deep pages cost the same as the first.
+    Read from the replica when it is current.
+    """
+    query = LeaveRequest.query.filter(LeaveRequest.user_id == user_id)
+    if cursor:
+        start_date, leave_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            LeaveRequest.start_date < start_date,
+            and_(LeaveRequest.start_date == start_date, LeaveRequest.id < leave_id)
+        ))
+    with read_replica(user_id):
+        leaves = query.order_by(LeaveRequest.start_date.desc(), LeaveRequest.id.desc()).limit(page_size + 1).all()
+    next_cursor = encode_history_cursor(leaves[page_size - 1]) if len(leaves) > page_size else None
+    return leaves[:page_size], next_cursor
@@ -0,0 +1,78 @@
+# app/idempotency_manager.py
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from .models import db, SlackDelivery
+from .db_manager import dialect_insert
+from .logger import log
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "600"))
+# Seconds between purges of expired delivery keys, per process
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "60"))
+
+_lock = threading.Lock()
+_duplicates = 0
+_next_purge = 0.0
+
+def _purge_expired(now):
+    global _next_purge
+    with _lock:
+        if time.monotonic() < _next_purge:
+            return
+        _next_purge = time.monotonic() + IDEMPOTENCY_PURGE_INTERVAL
+    SlackDelivery.query.filter(SlackDelivery.expires_at <= now).delete(synchronize_session=False)
+
+def claim_delivery(key):
+    """Records `key` and returns True the first time it is seen within the TTL, False for redeliveries.
+
+    The claim is a row in the database, so a retry landing on another worker is caught too. An expired row is
+    taken over by the upsert; a live one makes it match nothing, which is how a duplicate is told apart.
+    """
+    global _duplicates
+    if not key:
+        return True
+    now = datetime.now()
+    _purge_expired(now)
+    result = db.session.execute(
+        dialect_insert(SlackDelivery).values(key=key, expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL))
+        .on_conflict_do_update(
+            index_elements=[SlackDelivery.key],
+            set_={'expires_at': now + timedelta(seconds=IDEMPOTENCY_TTL)},
+            where=SlackDelivery.expires_at <= now
+        )
+    )
+    db.session.commit()
+    if result.rowcount == 1:
+        return True
+    with _lock:
+        _duplicates += 1
+    return False
+
+def release_delivery(key):
+    """Forgets `key` so Slack's next retry of a delivery that failed is handled instead of acknowledged as a duplicate."""
+    if not key:
+        return
+    # The failed handler may have left its transaction half done
+    db.session.rollback()
+    try:
+        SlackDelivery.query.filter_by(key=key).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        log.error(f"Could not release Slack delivery {key}; its retries will be dropped until it expires: {e}")
+
+def get_duplicate_count():
+    return _duplicates
+
+def event_key(data):
+    event_id = data.get('event_id')
+    return f"event:{event_id}" if event_id else None
+
+def interaction_key(data):
+    if data.get('type') == 'view_submission':
+        view = data.get('view', {})
+        return f"view:{view.get('id')}:{view.get('hash')}" if view.get('id') else None
+    action_ts = data.get('actions', [{}])[0].get('action_ts')
+    trigger_id = data.get('trigger_id')
+    return f"action:{trigger_id}:{action_ts}" if trigger_id and action_ts else None
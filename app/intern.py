@@ -1,31 +1,48 @@
 from .models import db, User, LeaveRequest, LeaveStatus, ManagerMapping
 from datetime import datetime, timedelta
 from .color_manager import assign_color_to_user
-from .slack_message_manager import update_message_for_manager, send_message_to_manager
+from .digest_manager import notify_manager, enqueue_cancel_update
+from .calendar_manager import bump_leave_versions
+from .user_manager import is_balance_stale, reset_leave_balances, debit_leave_balance, credit_leave_balance
+from .business_day_manager import count_business_days, count_business_days_many
+from .history_manager import get_leave_history_page
+from .analytics_manager import record_leave_transition
+from .coverage_manager import record_coverage_transition
+from .block_template_manager import USER_NOT_FOUND, NO_OWN_PENDING_LEAVES, OWN_PENDING_LEAVE_ROW, block_list
 from .logger import log
 
+INTERN_MONTHLY_LEAVE_LIMIT = 2
+
+def check_leave_dates(start_date, end_date):
+    """Parses YYYY-MM-DD bounds and moves a weekend start to Monday.
+
+    Returns (start_date, end_date, leave_days, error); error is the user-facing rejection or None.
+    Raises ValueError on a malformed date.
+    """
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    weekend_check_flag=0
+    if start_date.weekday() >= 5: 
+        start_date += timedelta(days=(7 - start_date.weekday())) 
+        weekend_check_flag=1
+
+    if start_date > end_date and weekend_check_flag:
+        return start_date, end_date, 0, "Can't apply leave on weekend days"
+    
+    if end_date < start_date:
+        return start_date, end_date, 0, "End date cannot be earlier than start date."
+    
+    leave_days = count_business_days(start_date, end_date)
+    if leave_days == 0:
+        return start_date, end_date, 0, "There are no working days in the selected dates."
+    return start_date, end_date, leave_days, None
+
 def apply_leave(user_id, start_date, end_date, reason, user_name):
     try:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-        weekend_check_flag=0
-        if start_date.weekday() >= 5: 
-            start_date += timedelta(days=(7 - start_date.weekday())) 
-            weekend_check_flag=1
-
-        if start_date > end_date and weekend_check_flag:
-            return "Can't apply leave on weekend days"
-        
-        if end_date < start_date:
-            return "End date cannot be earlier than start date."
-        
-        leave_days = 0
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.weekday() < 5:  
-                leave_days += 1
-            current_date += timedelta(days=1)
-    
+        start_date, end_date, leave_days, error = check_leave_dates(start_date, end_date)
+        if error:
+            return error
+
         user = User.query.filter_by(slack_id=user_id).first()
         if user is None:
             user = User(slack_id=user_id, name=user_name, role="Intern")
@@ -33,25 +50,19 @@ def apply_leave(user_id, start_date, end_date, reason, user_name):
             assign_color_to_user(user)
             db.session.commit()
 
-        if user.role == 'Intern':
-            current_month = datetime.now().strftime('%Y-%m')
-            log.info("Last reset month: %s",user.last_reset_month)
-            if user.last_reset_month != current_month:
-                user.leave_balance = 2  # Reset to 2 days for the new month
-                user.last_reset_month = current_month
-                db.session.commit()
-
-        elif user.role == 'Manager':
-            current_year = datetime.now().strftime('%Y')
-            last_reset_year = user.last_reset_month.split('-')[0]
-            log.info("Last reset year: %s",last_reset_year)
-            if last_reset_year != current_year: 
-                carry_over = max(0, user.leave_balance)
-                user.leave_balance = min(14 + carry_over, 20)  # Reset to 14 days and carry over unused leave
-                user.last_reset_month = current_year
-                db.session.commit()
-
-        if user.leave_balance < leave_days:
+        # Normally done by the reset scheduler; catches a period rollover it has not reached yet
+        if is_balance_stale(user):
+            reset_leave_balances(slack_id=user.slack_id)
+            db.session.refresh(user)
+
+        manager_mapping = ManagerMapping.query.filter_by(employee_id=user.slack_id).first()
+        if not manager_mapping:
+            return "Manager not found."
+
+        # Debit first: the conditional UPDATE holds the lock while the checks below run, so concurrent
+        # submissions from this user queue behind it and see its leave row once it commits.
+        if not debit_leave_balance(user.slack_id, leave_days):
+            db.session.rollback()
             return "Insufficient leave balance."
 
         overlapping_leaves = LeaveRequest.query.filter(
@@ -62,6 +73,7 @@ def apply_leave(user_id, start_date, end_date, reason, user_name):
         ).all()
 
         if overlapping_leaves:
+            db.session.rollback()
             return "You have already applied for leave on one or more of these dates."
 
         if user.role == 'Intern':
@@ -73,18 +85,14 @@ def apply_leave(user_id, start_date, end_date, reason, user_name):
                 LeaveRequest.status.notin_([LeaveStatus.CANCELLED, LeaveStatus.DECLINED])
             ).all()
 
-            total_leave_days_this_month = sum(
-                (min(leave.end_date, end_date) - max(leave.start_date, start_date)).days + 1
-                for leave in leaves_this_month
-            )
+            total_leave_days_this_month = sum(count_business_days_many(
+                (leave.start_date, leave.end_date) for leave in leaves_this_month
+            ))
 
-            if total_leave_days_this_month + leave_days > 2:
+            if total_leave_days_this_month + leave_days > INTERN_MONTHLY_LEAVE_LIMIT:
+                db.session.rollback()
                 return "Leave limit exceeded. You can only take a maximum of 2 days leave per month."
 
-        manager_mapping = ManagerMapping.query.filter_by(employee_id=user.slack_id).first()
-        if not manager_mapping:
-            return "Manager not found."
-
         leave_request = LeaveRequest(
             user_id=user.slack_id,
             start_date=start_date,
@@ -93,12 +101,12 @@ def apply_leave(user_id, start_date, end_date, reason, user_name):
             manager_id=manager_mapping.manager_id
         )
         db.session.add(leave_request)
-        user.leave_balance -= leave_days
+        record_leave_transition(user.slack_id, start_date, end_date, None, LeaveStatus.PENDING)
+        record_coverage_transition(user.slack_id, manager_mapping.manager_id, start_date, end_date, LeaveStatus.PENDING)
+        bump_leave_versions(user.slack_id, manager_mapping.manager_id)
         db.session.commit()
-        try:
-            send_message_to_manager(manager_mapping.manager_id, leave_request.id, f"{user.name} has applied for leave from {start_date} to {end_date}.")
-        except Exception as e:
-            log.error(f"Error sending message: {e}")
+        db.session.refresh(user)
+        notify_manager(manager_mapping.manager_id, leave_request.id, f"{user.name} has applied for leave from {start_date} to {end_date}.")
 
         return (f"Leave applied successfully!\n"
                 f"User: {user_name}\n"
@@ -107,59 +115,31 @@ def apply_leave(user_id, start_date, end_date, reason, user_name):
                 f"Remaining Leave Balance: {user.leave_balance} days.")
 
     except ValueError as e:
+        db.session.rollback()
         return f"Invalid date format. Please use YYYY-MM-DD. Error: {e}"
     except Exception as e:
+        db.session.rollback()
         return f"An error occurred: {e}"
 
 def view_pending_leaves_ui(user_id):
+    """The user's pending leave as a serialised Block Kit list, one row with a Cancel button per request."""
     user = User.query.filter_by(slack_id=user_id).first()
     if not user:
-        return [
-            {
-                "type": "section",
-                "block_id": "no_user_found",
-                "text": {
-                    "type": "plain_text",
-                    "text": "User not found."
-                }
-            }
-        ]
+        return USER_NOT_FOUND
     pending_leaves = LeaveRequest.query.filter_by(user_id=user_id, status='PENDING').all()
     if not pending_leaves:
-        return [
-            {
-                "type": "section",
-                "block_id": "no_pending_leaves",
-                "text": {
-                    "type": "plain_text",
-                    "text": "You have no pending leave requests."
-                }
-            }
-        ]
-    leave_blocks = []
-    for leave in pending_leaves:
-        leave_blocks.append({
-            "type": "section",
-            "block_id": f"pending_leave_{leave.id}",
-            "text": {
-                "type": "mrkdwn",
-                "text": (f"*Leave ID:* {leave.id}\n"
-                         f"*From:* {leave.start_date.strftime('%Y-%m-%d')}\n"
-                         f"*To:* {leave.end_date.strftime('%Y-%m-%d')}\n"
-                         f"*Reason:* {leave.reason}")
-            },
-            "accessory": {
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "Cancel"
-                },
-                "action_id": f"cancel_{leave.id}",
-                "style": "danger"
-            }
-        })
-    
-    return leave_blocks
+        return NO_OWN_PENDING_LEAVES
+    return block_list(*(
+        OWN_PENDING_LEAVE_ROW.render(
+            block_id=f"pending_leave_{leave.id}",
+            text=(f"*Leave ID:* {leave.id}\n"
+                  f"*From:* {leave.start_date.strftime('%Y-%m-%d')}\n"
+                  f"*To:* {leave.end_date.strftime('%Y-%m-%d')}\n"
+                  f"*Reason:* {leave.reason}"),
+            action_id=f"cancel_{leave.id}"
+        )
+        for leave in pending_leaves
+    ))
 
 def view_pending_leaves(user_id):
     user = User.query.filter_by(slack_id=user_id).first()
@@ -190,27 +170,39 @@ def cancel_leave_request(user_id, leave_id):
         if leave_request.status == LeaveStatus.CANCELLED:
             return {"error": "Leave request is already cancelled."}
     
-        leave_days = (leave_request.end_date - leave_request.start_date).days + 1
-        user.leave_balance += leave_days
-        leave_request.status = LeaveStatus.CANCELLED
+        cancelled = LeaveRequest.query.filter_by(id=leave_request.id, status=LeaveStatus.PENDING).update(
+            {LeaveRequest.status: LeaveStatus.CANCELLED}, synchronize_session=False
+        )
+        if not cancelled:
+            db.session.rollback()
+            return "Leave request not found or not in pending status."
+        leave_days = count_business_days(leave_request.start_date, leave_request.end_date)
+        credit_leave_balance(user.slack_id, leave_days)
+        record_leave_transition(user.slack_id, leave_request.start_date, leave_request.end_date,
+                                LeaveStatus.PENDING, LeaveStatus.CANCELLED)
+        record_coverage_transition(user.slack_id, leave_request.manager_id, leave_request.start_date,
+                                   leave_request.end_date, LeaveStatus.CANCELLED)
+        bump_leave_versions(leave_request.user_id, leave_request.manager_id)
         db.session.commit()
 
-        if leave_request.channel_id and leave_request.message_ts:
-            update_message_for_manager(leave_request.channel_id, leave_request.message_ts, user.name)
+        enqueue_cancel_update(leave_request, user.name)
         return f"Leave request (ID: {leave_id}) cancelled successfully. Leave days added back to your balance."
 
     except Exception as e:
+        db.session.rollback()
         return f"An error occurred: {e}"
 
-def view_past_leaves(user_id):
+def view_past_leaves(user_id, cursor=None):
     user = User.query.filter_by(slack_id=user_id).first()
     if not user:
         return "User not found."
     
-    leave_requests = LeaveRequest.query.filter_by(user_id=user.slack_id).all()
+    leave_requests, next_cursor = get_leave_history_page(user.slack_id, cursor)
     past_leaves = [f"Leave from {lr.start_date} to {lr.end_date}: {lr.status}" for lr in leave_requests]
     if not past_leaves:
         return "No leave history found"
+    if next_cursor:
+        past_leaves.append(f"Older leave: `/pastleaves {next_cursor}`")
     return "\n".join(past_leaves)
 
 def view_leave_balance(user_id):
@@ -1,7 +1,16 @@
+from sqlalchemy.orm import joinedload
 from .models import db, User, LeaveRequest, LeaveStatus, ManagerMapping
 from .color_manager import assign_color_to_user
 from app.models import db, User, LeaveRequest
 from .slack_message_manager import update_message, send_message_from_manager
+from .slack_delivery_manager import enqueue_delivery
+from .calendar_manager import bump_leave_versions
+from .business_day_manager import count_business_days
+from .history_manager import get_leave_history_page
+from .analytics_manager import record_leave_transition
+from .coverage_manager import record_coverage_transition
+from .user_manager import INTERN_MONTHLY_BALANCE, MANAGER_MAX_BALANCE, credit_leave_balance
+from .block_template_manager import NO_TEAM_PENDING_LEAVES, TEAM_PENDING_LEAVE_ROW, block_list
 from .logger import log
 
 def create_manager(slack_id, name):
@@ -20,75 +29,32 @@ def create_manager(slack_id, name):
     
 def view_all_pending_leaves_ui(manager_id):
     log.info("Manager id: %s",manager_id)
-    pending_leaves = LeaveRequest.query.filter_by(
+    pending_leaves = LeaveRequest.query.options(joinedload(LeaveRequest.user)).filter_by(
             status=LeaveStatus.PENDING,
             manager_id=manager_id
         ).all()
     if not pending_leaves:
-        return [{
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "No pending leave requests found."
-            }
-        }]
-    
-    blocks = []
-    for leave in pending_leaves:
-        user = User.query.get(leave.user_id)
-        leave_id = leave.id
-        user_name = user.name
-        start_date = leave.start_date.strftime('%Y-%m-%d')
-        end_date = leave.end_date.strftime('%Y-%m-%d')
-        reason = leave.reason
-        
-        blocks.append({
-            "type": "section",
-            "block_id": f"pending_leave_{leave_id}",
-            "text": {
-                "type": "mrkdwn",
-                "text": (f"*User:* {user_name}\n"
-                         f"*Start Date:* {start_date}\n"
-                         f"*End Date:* {end_date}\n"
-                         f"*Reason:* {reason}")
-            }
-        })
-
-        blocks.append({
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Approve"
-                    },
-                    "action_id": "approve",
-                    "value": str(leave_id)
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Decline"
-                    },
-                    "action_id": "decline",
-                    "value": str(leave_id)
-                }
-            ]
-        })
-    
-    return blocks
+        return NO_TEAM_PENDING_LEAVES
+    return block_list(*(
+        TEAM_PENDING_LEAVE_ROW.render(
+            block_id=f"pending_leave_{leave.id}",
+            text=(f"*User:* {leave.user.name}\n"
+                  f"*Start Date:* {leave.start_date.strftime('%Y-%m-%d')}\n"
+                  f"*End Date:* {leave.end_date.strftime('%Y-%m-%d')}\n"
+                  f"*Reason:* {leave.reason}"),
+            leave_id=str(leave.id)
+        )
+        for leave in pending_leaves
+    ))
 
 def view_all_pending_leaves():
-    pending_leaves = LeaveRequest.query.filter_by(status=LeaveStatus.PENDING).all()
+    pending_leaves = LeaveRequest.query.options(joinedload(LeaveRequest.user)).filter_by(status=LeaveStatus.PENDING).all()
     if not pending_leaves:
         return "No pending leave requests found."
 
     response = "Pending leave requests:\n"
     for index, leave in enumerate(pending_leaves, start=1):
-        user = User.query.get(leave.user_id)
-        response += (f"{index}. Leave ID: {leave.id} - User: {user.name} - "
+        response += (f"{index}. Leave ID: {leave.id} - User: {leave.user.name} - "
                      f"From {leave.start_date} to {leave.end_date} - Reason: {leave.reason}\n")
     return response
 
@@ -118,25 +84,44 @@ def approve_or_decline_leave(user_id, leave_id, action):
         leave_request = LeaveRequest.query.filter_by(id=leave_id).first()
         if not leave_request:
             return "Leave request not found."
-        leave_days = (leave_request.end_date - leave_request.start_date).days + 1
-        intern = leave_request.user
+        if leave_request.status != LeaveStatus.PENDING:
+            # A repeated click or redelivered action must not decide (or refund) the same leave twice
+            return f"Leave request has already been {leave_request.status.value.lower()}."
         if action.lower() == 'approve':
-            leave_request.status = LeaveStatus.APPROVED
+            new_status = LeaveStatus.APPROVED
         elif action.lower() == 'decline':
-            leave_request.status = LeaveStatus.DECLINED
-            intern.leave_balance = min(intern.leave_balance + leave_days, 2)
+            new_status = LeaveStatus.DECLINED
         else:
             return "Invalid action. Please specify 'approve' or 'decline'."
+        # Conditional on PENDING so a concurrent cancel or second decision loses cleanly instead of double-refunding
+        decided = LeaveRequest.query.filter_by(id=leave_request.id, status=LeaveStatus.PENDING).update(
+            {LeaveRequest.status: new_status}, synchronize_session=False
+        )
+        if not decided:
+            db.session.rollback()
+            db.session.refresh(leave_request)
+            return f"Leave request has already been {leave_request.status.value.lower()}."
+        intern = leave_request.user
+        if new_status == LeaveStatus.DECLINED:
+            leave_days = count_business_days(leave_request.start_date, leave_request.end_date)
+            max_balance = INTERN_MONTHLY_BALANCE if intern.role == 'Intern' else MANAGER_MAX_BALANCE
+            credit_leave_balance(intern.slack_id, leave_days, max_balance)
+        record_leave_transition(intern.slack_id, leave_request.start_date, leave_request.end_date,
+                                LeaveStatus.PENDING, new_status)
+        record_coverage_transition(intern.slack_id, leave_request.manager_id, leave_request.start_date,
+                                   leave_request.end_date, new_status)
+        bump_leave_versions(leave_request.user_id, leave_request.manager_id)
         db.session.commit()
         # Notify the intern
-        send_message_from_manager(leave_request.user.slack_id, f"Your leave request from {leave_request.start_date} to {leave_request.end_date} has been {leave_request.status.value.lower()}.")
+        enqueue_delivery(send_message_from_manager, intern.slack_id, f"Your leave request from {leave_request.start_date} to {leave_request.end_date} has been {new_status.value.lower()}.")
 
-        return f"Leave request has been {leave_request.status.value.lower()}."
+        return f"Leave request has been {new_status.value.lower()}."
 
     except Exception as e:
+        db.session.rollback()
         return f"An error occurred: {e}"
     
-def view_intern_leave_history(intern_id,manager_id):
+def view_intern_leave_history(intern_id,manager_id,cursor=None):
     manager = User.query.filter_by(slack_id=manager_id).first()
     if not manager:
         return "Manager not found."
@@ -145,10 +130,12 @@ def view_intern_leave_history(intern_id,manager_id):
         return "Intern not found."
     if not ManagerMapping.query.filter_by(employee_id=intern.slack_id, manager_id=manager.slack_id).first():
         return "You do not have permission to view this intern's leave history."
-    leave_requests = LeaveRequest.query.filter_by(user_id=intern.slack_id).all()
+    leave_requests, next_cursor = get_leave_history_page(intern.slack_id, cursor)
     if not leave_requests:
         return f"No leave history found for {intern.name}."
     leave_history = [
         f"Leave ID: {lr.id} - From {lr.start_date} to {lr.end_date}: {lr.status.name}" for lr in leave_requests
     ]
+    if next_cursor:
+        leave_history.append(f"Older leave: `/leavehistory {intern.slack_id} {next_cursor}`")
     return "\n".join(leave_history)
\ No newline at end of file
@@ -0,0 +1,139 @@
+# app/metrics_manager.py
+import threading
+import time
+from collections import defaultdict
+from flask import g, request
+from .logger import log
+from .query_manager import start_query_count, stop_query_count
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0)
+
+def _label_text(names, values):
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a tuple of label values."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self, name, label_names):
+        lines = []
+        with self.lock:
+            for labels, series in sorted(self.series.items()):
+                label_text = _label_text(label_names, labels)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {series["count"]}')
+                lines.append(f'{name}_sum{{{label_text}}} {series["sum"]:.6f}')
+                lines.append(f'{name}_count{{{label_text}}} {series["count"]}')
+        return lines
+
+class Counter:
+    def __init__(self):
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.values[labels] += amount
+
+    def render(self, name, label_names):
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f'{name}{{{_label_text(label_names, labels)}}} {value:g}' for labels, value in items]
+
+request_latency = Histogram()
+request_db_queries = Histogram(buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100))
+request_db_seconds = Histogram()
+slack_latency = Histogram()
+slack_errors = Counter()
+
+def observe_slack_call(api_method, seconds, error=None):
+    slack_latency.observe((api_method,), seconds)
+    if error:
+        slack_errors.inc((api_method, error))
+
+def slack_error_label(status_code, content):
+    if status_code != 200:
+        return str(status_code)
+    # Slack replies with compact JSON; avoid a full parse on the hot path
+    head = content[:32]
+    return None if b'"ok":true' in head or b'"ok": true' in head else "not_ok"
+
+def _before_request():
+    g.metrics_started_at = time.perf_counter()
+    g.metrics_queries = start_query_count(keep_statements=False)
+
+def _after_request(response):
+    started_at = g.pop('metrics_started_at', None)
+    counter = g.pop('metrics_queries', None)
+    if started_at is None:
+        return response
+    stop_query_count(counter)
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    labels = (request.method, route, str(response.status_code))
+    request_latency.observe(labels, time.perf_counter() - started_at)
+    request_db_queries.observe(labels[:2], counter.count)
+    request_db_seconds.observe(labels[:2], counter.seconds)
+    return response
+
+def _teardown_request(exception):
+    counter = g.pop('metrics_queries', None)
+    if counter is not None:
+        stop_query_count(counter)
+
+def init_metrics(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+def _gauges(name, values, help_text):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f'{name}{{name="{key}"}} {value:g}' for key, value in sorted(values.items()))
+    return lines
+
+def _counters(name, values, help_text):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines.extend(f'{name}{{name="{key}"}} {value:g}' for key, value in sorted(values.items()))
+    return lines
+
+def render_metrics():
+    from .slack_http_manager import get_slack_http_metrics
+    from .slack_delivery_manager import get_delivery_metrics
+    from .idempotency_manager import get_duplicate_count
+    from .slack_signature_manager import signature_rejections
+
+    lines = ["# HELP leavebot_request_seconds Request latency by route.", "# TYPE leavebot_request_seconds histogram"]
+    lines += request_latency.render("leavebot_request_seconds", ("method", "route", "status"))
+    lines += ["# HELP leavebot_request_db_queries SQL statements per request.", "# TYPE leavebot_request_db_queries histogram"]
+    lines += request_db_queries.render("leavebot_request_db_queries", ("method", "route"))
+    lines += ["# HELP leavebot_request_db_seconds Time spent in SQL per request.", "# TYPE leavebot_request_db_seconds histogram"]
+    lines += request_db_seconds.render("leavebot_request_db_seconds", ("method", "route"))
+    lines += ["# HELP leavebot_slack_call_seconds Slack Web API call latency by method.", "# TYPE leavebot_slack_call_seconds histogram"]
+    lines += slack_latency.render("leavebot_slack_call_seconds", ("method",))
+    lines += ["# HELP leavebot_slack_call_errors_total Failed Slack Web API calls by method and error.", "# TYPE leavebot_slack_call_errors_total counter"]
+    lines += slack_errors.render("leavebot_slack_call_errors_total", ("method", "error"))
+    lines += _counters("leavebot_slack_transport_total", get_slack_http_metrics(), "Slack transport counters (calls, throttled, retried, failed).")
+    lines += _gauges("leavebot_delivery_queue", get_delivery_metrics(), "Background Slack delivery queue state.")
+    lines += ["# HELP leavebot_slack_signature_rejections_total Requests to /slack/* rejected before parsing, by reason.", "# TYPE leavebot_slack_signature_rejections_total counter"]
+    lines += signature_rejections.render("leavebot_slack_signature_rejections_total", ("reason",))
+    lines += ["# HELP leavebot_duplicate_deliveries_total Redelivered Slack events acknowledged without work.", "# TYPE leavebot_duplicate_deliveries_total counter"]
+    lines.append(f"leavebot_duplicate_deliveries_total {get_duplicate_count()}")
+    return "\n".join(lines) + "\n"
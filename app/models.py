@@ -1,10 +1,11 @@
 import enum
-from sqlalchemy import Column, String, Date, Enum, ForeignKey
+from sqlalchemy import Column, String, Date, Enum, ForeignKey, inspect
 from sqlalchemy.orm import relationship
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from .db_manager import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class LeaveStatus(enum.Enum):
     PENDING = "Pending"
@@ -34,8 +35,8 @@ class User(db.Model):
 # Table for mapping employees to managers
 class ManagerMapping(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False)
-    manager_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False)
+    employee_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False, index=True)
+    manager_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False, index=True)
 
     # Relationships
     employee = relationship('User', foreign_keys=[employee_id], backref='managers')
@@ -43,6 +44,12 @@ class ManagerMapping(db.Model):
 
 # Table for leave requests
 class LeaveRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_leave_request_user_status', 'user_id', 'status'),
+        db.Index('ix_leave_request_manager_status', 'manager_id', 'status'),
+        db.Index('ix_leave_request_user_dates', 'user_id', 'start_date', 'end_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False)  # The employee requesting leave
     manager_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), nullable=False)  # The manager overseeing this request
@@ -60,4 +67,60 @@ class LeaveRequest(db.Model):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if self.start_date > self.end_date:
-            raise ValueError("Start date cannot be after the end date")
\ No newline at end of file
+            raise ValueError("Start date cannot be after the end date")
+
+# Slack event / interaction deliveries already claimed by a worker, kept until expires_at to spot Slack's retries
+class SlackDelivery(db.Model):
+    key = db.Column(db.String(255), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+# Per-user counter bumped whenever a leave visible on that user's calendar changes
+class LeaveVersion(db.Model):
+    slack_id = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Named monotonic counters, e.g. the next colour index to hand out
+class AppCounter(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+# Business days of leave per user, calendar month and weekday (0 = Monday), kept current by analytics_manager
+class LeaveMonthlyRollup(db.Model):
+    user_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    weekday = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    approved_days = db.Column(db.Integer, nullable=False, default=0)
+    pending_days = db.Column(db.Integer, nullable=False, default=0)
+    declined_days = db.Column(db.Integer, nullable=False, default=0)
+
+# One row per working day a team member is on (pending or approved) leave, keyed for "who is off between X and Y"
+class TeamDayOff(db.Model):
+    manager_id = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), primary_key=True)
+    approved = db.Column(db.Boolean, nullable=False, default=False)
+
+# Managers who get new leave requests as a periodic digest instead of one message per request
+class ManagerDigest(db.Model):
+    manager_id = db.Column(db.String(50), db.ForeignKey('user.slack_id'), primary_key=True)
+    last_sent_at = db.Column(db.DateTime, nullable=True)
+
+# A leave request waiting for, or listed in, its manager's digest; batch is null until a sender claims it, and
+# claimed_at is set only while that sender has not posted it yet
+class DigestEntry(db.Model):
+    leave_id = db.Column(db.Integer, db.ForeignKey('leave_request.id'), primary_key=True, autoincrement=False)
+    manager_id = db.Column(db.String(50), nullable=False, index=True)
+    batch = db.Column(db.String(36), nullable=True, index=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+
+def ensure_indexes():
+    """Creates any model index missing from an existing database. create_all only adds indexes alongside new tables."""
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    return created
@@ -0,0 +1,74 @@
+# app/query_manager.py
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from .models import db
+
+_local = threading.local()
+_listening_engines = set()
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+        self.keep_statements = True
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counters = getattr(_local, 'counters', None)
+    if counters:
+        context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counters = getattr(_local, 'counters', None)
+    if not counters:
+        return
+    elapsed = time.perf_counter() - getattr(context, '_query_started_at', time.perf_counter())
+    for counter in counters:
+        counter.count += 1
+        counter.seconds += elapsed
+        if counter.keep_statements:
+            counter.statements.append(statement)
+
+def _listen(engine):
+    if id(engine) in _listening_engines:
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    _listening_engines.add(id(engine))
+
+def start_query_count(engine=None, keep_statements=True):
+    """Starts counting the current thread's SQL statements; pair with stop_query_count."""
+    _listen(engine or db.engine)
+    counter = QueryCounter()
+    counter.keep_statements = keep_statements
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = []
+    counters.append(counter)
+    return counter
+
+def stop_query_count(counter):
+    counters = getattr(_local, 'counters', None)
+    if counters and counter in counters:
+        counters.remove(counter)
+    return counter
+
+@contextmanager
+def count_queries(engine=None):
+    """Counts the SQL statements issued by the current thread inside the block."""
+    counter = start_query_count(engine)
+    try:
+        yield counter
+    finally:
+        stop_query_count(counter)
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Fails with AssertionError when the block issues more than `limit` SQL statements."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{statements}")
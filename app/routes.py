@@ -1,24 +1,102 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, g, request, jsonify, render_template, make_response, current_app, Response, stream_with_context
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 from .intern import apply_leave, cancel_leave_request, view_past_leaves, view_leave_balance, view_pending_leaves
 from .manager import approve_or_decline_leave, view_intern_leave_history, view_all_pending_leaves, make_manager
 from .models import User,db, ManagerMapping, LeaveRequest, LeaveStatus
 from .color_manager import assign_color_to_user
-from .slack_manager import get_slack_user_info
+from .slack_manager import get_slack_user_info, update_user_name
+from .slack_directory_manager import get_display_name
 from .slack_ui_manager import update_home_manager_ui, update_home_ui
-from .slack_message_manager import send_dm_message, get_user_name, update_message
-from .slack_modal_manager import open_intern_users_modal
+from .slack_message_manager import send_dm_message, get_user_name
+from .slack_modal_manager import open_intern_users_modal, build_leave_history_view
+from .slack_async_manager import slack_post_async
+from .slack_delivery_manager import enqueue_delivery
+from .metrics_manager import render_metrics
+from .bulk_leave_manager import detect_format, import_leaves, export_leaves
+from .analytics_manager import MAX_ANALYTICS_MONTHS, parse_month, get_team_analytics
+from .idempotency_manager import claim_delivery, release_delivery, event_key, interaction_key
+from .calendar_manager import get_leave_version, parse_calendar_bound, leave_events_etag
+from .db_manager import read_replica
+from .block_template_manager import (
+    APPLY_LEAVE_MODAL, APPLY_LEAVE_RESULT_MODAL, CALENDAR_MODAL, ERROR_MODAL, LEAVE_HISTORY_REQUEST_MODAL,
+    VIEWS_OPEN, VIEWS_UPDATE
+)
+from .digest_manager import enqueue_decision_update, set_digest_mode
+from .slack_signature_manager import verify_slack_request
 from .slack_interaction_manager import handle_interactive_message, handle_interactive_message_calendar
 from .logger import log
+import hmac
+import io
 import json
-import requests
 import os
-from datetime import timedelta
+from datetime import date, timedelta
 
 bp = Blueprint('routes', __name__)
+bp.before_request(verify_slack_request)
 slack_token = os.getenv("SLACK_BOT_TOKEN")
 calendar_url = os.getenv("CALENDAR_URL")
 
+def claim_slack_delivery(key):
+    """claim_delivery for this request; the key is released again if handling it fails (see release_failed_delivery)."""
+    if not claim_delivery(key):
+        return False
+    g.delivery_key = key
+    return True
+
+@bp.after_request
+def release_failed_delivery(response):
+    if response.status_code >= 500:
+        release_delivery(g.pop('delivery_key', None))
+    return response
+
+@bp.teardown_request
+def release_delivery_on_error(error):
+    if error is not None:
+        release_delivery(g.pop('delivery_key', None))
+
+def duplicate_delivery_response(retry_num):
+    log.info("Acknowledging duplicate Slack delivery (retry %s).", retry_num)
+    response = make_response('', 200)
+    response.headers['X-Slack-No-Retry'] = '1'
+    return response
+
+@bp.route('/metrics')
+def metrics():
+    return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+def has_admin_token():
+    token = current_app.config.get('ADMIN_API_TOKEN')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+@bp.route('/api/leaves/import', methods=['POST'])
+def import_leave_records():
+    if not has_admin_token():
+        return jsonify({"error": "Unauthorized"}), 401
+    upload = request.files.get('file')
+    if upload:
+        fmt = request.args.get('format') or detect_format(upload.filename)
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    else:
+        fmt = request.args.get('format') or detect_format(None, 'jsonl' if 'json' in (request.mimetype or '') else 'csv')
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    return jsonify(import_leaves(lines, fmt))
+
+@bp.route('/api/leaves/export', methods=['GET'])
+def export_leave_records():
+    if not has_admin_token():
+        return jsonify({"error": "Unauthorized"}), 401
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(export_leaves(fmt)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=leave_requests.{fmt}'
+    return response
+
 @bp.route('/')
 def home():
     return "Welcome to the Leave Bot Application!!"
@@ -31,31 +109,72 @@ def calendar():
 
 @bp.route('/api/leave-events/<string:slack_id>', methods=['GET'])
 def get_leave_events(slack_id):
-    manager = User.query.filter_by(slack_id=slack_id).first()
-    if not manager:
-        return jsonify({"error": "Manager not found"}), 404
-    leave_requests = LeaveRequest.query.filter(
-        or_(
-            LeaveRequest.user_id == manager.slack_id,  
-            LeaveRequest.manager_id == manager.slack_id      
+    try:
+        window_start = parse_calendar_bound(request.args.get('start'))
+        window_end = parse_calendar_bound(request.args.get('end'))
+    except ValueError:
+        return jsonify({"error": "start and end must be ISO dates"}), 400
+    version = get_leave_version(slack_id)
+    etag = leave_events_etag(slack_id, version, window_start, window_end)
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    with read_replica(slack_id, version):
+        manager = User.query.filter_by(slack_id=slack_id).first()
+        if not manager:
+            return jsonify({"error": "Manager not found"}), 404
+        leave_requests = LeaveRequest.query.options(joinedload(LeaveRequest.user)).filter(
+            or_(
+                LeaveRequest.user_id == manager.slack_id,  
+                LeaveRequest.manager_id == manager.slack_id      
+            )
+        ).filter(
+            LeaveRequest.status.in_([LeaveStatus.APPROVED, LeaveStatus.PENDING])
         )
-    ).filter(
-        LeaveRequest.status.in_([LeaveStatus.APPROVED, LeaveStatus.PENDING])
-    ).all()
+        # FullCalendar's end bound is exclusive
+        if window_start:
+            leave_requests = leave_requests.filter(LeaveRequest.end_date >= window_start)
+        if window_end:
+            leave_requests = leave_requests.filter(LeaveRequest.start_date < window_end)
+        leave_requests = leave_requests.all()
     events = []
-    for request in leave_requests:
+    for leave_request in leave_requests:
         event = {
-            'id': request.id,
-            'title': f"{request.user.name} - {request.reason}",
-            'start': request.start_date.isoformat(),
-            'end': (request.end_date + timedelta(days=1)).isoformat(), 
-            'backgroundColor': request.user.color if request.status == LeaveStatus.APPROVED else '#808080',  # Grey for pending
-            'borderColor': '#808080' if request.status == LeaveStatus.PENDING else request.user.color,
-            'textColor': '#ffffff' if request.status == LeaveStatus.PENDING else '#000000',
-            'status': request.status.value
+            'id': leave_request.id,
+            'title': f"{leave_request.user.name} - {leave_request.reason}",
+            'start': leave_request.start_date.isoformat(),
+            'end': (leave_request.end_date + timedelta(days=1)).isoformat(), 
+            'backgroundColor': leave_request.user.color if leave_request.status == LeaveStatus.APPROVED else '#808080',  # Grey for pending
+            'borderColor': '#808080' if leave_request.status == LeaveStatus.PENDING else leave_request.user.color,
+            'textColor': '#ffffff' if leave_request.status == LeaveStatus.PENDING else '#000000',
+            'status': leave_request.status.value
         }
         events.append(event)
-    return jsonify(events)
+    response = jsonify(events)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@bp.route('/api/analytics/<string:manager_id>', methods=['GET'])
+def team_analytics(manager_id):
+    manager = User.query.filter_by(slack_id=manager_id, role='Manager').first()
+    if not manager:
+        return jsonify({"error": "Manager not found"}), 404
+    this_month = date.today().replace(day=1)
+    try:
+        last_month = parse_month(request.args['to']) if request.args.get('to') else this_month
+        first_month = parse_month(request.args['from']) if request.args.get('from') else \
+            date(last_month.year - 1, last_month.month, 1) + timedelta(days=31)
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYY-MM"}), 400
+    first_month = first_month.replace(day=1)
+    month_count = (last_month.year - first_month.year) * 12 + last_month.month - first_month.month + 1
+    if month_count < 1 or month_count > MAX_ANALYTICS_MONTHS:
+        return jsonify({"error": f"from..to must cover 1 to {MAX_ANALYTICS_MONTHS} months"}), 400
+    return jsonify(get_team_analytics(manager.slack_id, first_month, last_month))
 
 @bp.route('/api/update-leave-status/<int:leave_id>', methods=['POST'])
 def update_leave_status(leave_id):
@@ -63,9 +182,9 @@ def update_leave_status(leave_id):
     response = handle_interactive_message_calendar(data["status"],leave_id)
     leave_request = LeaveRequest.query.filter_by(id=leave_id).one()
     manager_id=leave_request.manager_id
-    update_response = update_home_manager_ui(manager_id, slack_token)
-    if "error" in response or update_response.status_code != 200:
-            return jsonify({"status": "error", "message": "Failed to update the home UI or send DM."}), 500
+    if "error" in response:
+        return jsonify({"status": "error", "message": response}), 500
+    enqueue_delivery(update_home_manager_ui, manager_id, slack_token)
     return jsonify({'success': True})
 
 @bp.route('/slack/apps_home', methods=['POST'])
@@ -77,7 +196,9 @@ def app_home():
 
     log.info("HOME UI Loading...")
     data = request.json
-    log.info("Home UI Data: %s ",data)
+    log.debug("Home UI Data: %s ",data)
+    if not claim_slack_delivery(event_key(data)):
+        return duplicate_delivery_response(request.headers.get('X-Slack-Retry-Num'))
 
     user_id = data.get('event', {}).get('user') or data.get('event', {}).get('message', {}).get('user') or data.get('event', {}).get('edited', {}).get('user')
     if not user_id:
@@ -87,9 +208,8 @@ def app_home():
     log.info("Current User: %s",user)
     
     if not user:
-        slack_user_info = get_slack_user_info(user_id,slack_token)
-        log.info("Slack user info: %s",slack_user_info)
-        user_name = slack_user_info.get('profile', {}).get('real_name', 'Unknown')
+        slack_user_info = get_slack_user_info(user_id, on_fetched=update_user_name)
+        user_name = get_display_name(slack_user_info, 'Unknown')
         user = User(slack_id=user_id, name=user_name)
         db.session.add(user)
         assign_color_to_user(user)
@@ -99,10 +219,10 @@ def app_home():
     is_manager = user.role == 'Manager'
 
     if is_intern:
-        update_home_ui(user_id,slack_token)
+        enqueue_delivery(update_home_ui, user_id, slack_token)
 
     elif is_manager:
-        update_home_manager_ui(user_id,slack_token)
+        enqueue_delivery(update_home_manager_ui, user_id, slack_token)
      
     return jsonify({"status": "ok"})
 
@@ -117,6 +237,8 @@ def handle_interactions():
         data = json.loads(payload)
     except json.JSONDecodeError:
         return jsonify({"error": "Invalid JSON in payload"}), 400
+    if not claim_slack_delivery(interaction_key(data)):
+        return duplicate_delivery_response(request.headers.get('X-Slack-Retry-Num'))
 
     action_id = data.get('actions', [{}])[0].get('action_id')
     log.info("Current action in handle/interaction: %s",action_id)
@@ -130,38 +252,12 @@ def handle_interactions():
             start_date = values.get('start_date', {}).get('start_date', {}).get('selected_date')
             end_date = values.get('end_date', {}).get('end_date', {}).get('selected_date')
             reason = values.get('reason', {}).get('reason', {}).get('value')
-            user_name = get_user_name(user_id)
+            # On a directory miss the handle stands in until the profile arrives and replaces it
+            user_name = get_user_name(user_id, data.get('user', {}).get('name', 'User'), on_fetched=update_user_name)
             response_message = apply_leave(user_id, start_date, end_date, reason, user_name)
-            update_modal_view = {
-                "type": "modal",
-                "callback_id": "apply_leave_modal",
-                "title": {
-                    "type": "plain_text",
-                    "text": "Apply for Leave"
-                },
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": response_message
-                        }
-                    }
-                ]
-            }
-            response = requests.post(
-                'https://slack.com/api/views.update',
-                headers={
-                    'Authorization': f'Bearer {slack_token}',
-                    'Content-Type': 'application/json; charset=utf-8'
-                },
-                json={
-                    'view_id': view_id,
-                    'view': update_modal_view
-                }
-            )
-            if response.status_code != 200:
-                return jsonify({"status": "error", "message": response.text}), response.status_code
+            slack_post_async('views.update', VIEWS_UPDATE.render(
+                view_id=view_id, view=APPLY_LEAVE_RESULT_MODAL.render(text=response_message)
+            ), user_id=user_id)
             return jsonify({"status": "ok"})
         if callback_id == 'intern_leave_history_request':
             slack_id = values.get('slack_id_block', {}).get('slack_id_input', {}).get('value')
@@ -175,142 +271,28 @@ def handle_interactions():
             manager = User.query.filter_by(slack_id=manager_mapping.manager_id).first()
             if not manager:
                 return "Manager not found."
-            leave_balance_message = view_leave_balance(slack_id)
-            leave_history = view_intern_leave_history(slack_id,manager.slack_id)
-            leave_history_message = f"Leave History for {user.name}:\n\n" + leave_history
-            update_modal_view = {
-                "type": "modal",
-                "callback_id": "intern_leave_history_request",
-                "title": {
-                    "type": "plain_text",
-                    "text": "Leave History"
-                },
-                "blocks": [
-                     {
-                        "type": "section",
-                        "block_id": "leave_balance",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": leave_balance_message
-                        }
-                    },
-                    {
-                        "type": "divider"
-                    },
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": leave_history_message
-                        }
-                    }
-                ]
-            }
-            response = requests.post(
-                'https://slack.com/api/views.update',
-                headers={
-                    'Authorization': f'Bearer {slack_token}',
-                    'Content-Type': 'application/json; charset=utf-8'
-                },
-                json={
-                    'view_id': view_id,
-                    'view': update_modal_view
-                }
+            update_modal_view = build_leave_history_view(
+                slack_id, f"Leave History for {user.name}:", "intern_leave_history_request"
             )
-            if response.status_code != 200:
-                return jsonify({"status": "error", "message": response.text}), response.status_code
+            slack_post_async('views.update', {
+                'view_id': view_id,
+                'view': update_modal_view
+            }, user_id=user_id)
             return jsonify({"status": "ok"})
     if action_id == "open_calendar":
         return jsonify({"status": "ok"})
     if action_id == 'view_calendar':
         slack_id=user_id
         log.info("User who accessed Calender: %s",slack_id)
-        response = requests.post(
-            'https://slack.com/api/views.open',
-            headers={
-                'Authorization': f'Bearer {slack_token}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                "trigger_id": data['trigger_id'],
-                "view": {
-                    "type": "modal",
-                    "callback_id": "calendar_modal",
-                    "title": {
-                        "type": "plain_text",
-                        "text": "Leave Calendar"
-                    },
-                    "blocks": [
-                        {
-                            "type": "section",
-                            "block_id": "calendar_block",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": "Here is the leave calendar:"
-                            },
-                            "accessory": {
-                                "type": "button",
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "Open Calendar",
-                                    "emoji": True
-                                },
-                                "action_id": "open_calendar",
-                                "url": f"{calendar_url}/calendar?slack_id={slack_id}"
-                            }
-                        }
-                    ]
-                }
-            }
-        )
-        if response.status_code != 200:
-            log.error(f"Error opening modal: {response.text}")
+        slack_post_async('views.open', VIEWS_OPEN.render(
+            trigger_id=data['trigger_id'],
+            view=CALENDAR_MODAL.render(url=f"{calendar_url}/calendar?slack_id={slack_id}")
+        ), user_id=user_id)
         return jsonify({"status": "ok"})
     if action_id == 'view_user_leave_history':
         trigger_id = data.get('trigger_id')
         log.info("Trigger id of view_user_leave_history: %s",trigger_id)
-        modal_view = {
-            "type": "modal",
-            "callback_id": "intern_leave_history_request",
-            "title": {
-                "type": "plain_text",
-                "text": "Leave History"
-            },
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "slack_id_block",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "Enter User ID"
-                    },
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "slack_id_input",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "e.g., U07GHFFEHDH"
-                        }
-                    },
-                    "optional": False  
-                }
-            ],
-            "submit": {
-                "type": "plain_text",
-                "text": "Submit"
-            },
-            "close": {
-                "type": "plain_text",
-                "text": "Cancel"
-            }
-        }
-        response = requests.post('https://slack.com/api/views.open', headers={
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/json'
-        }, json={
-            "trigger_id": trigger_id,
-            "view": modal_view
-        })
+        slack_post_async('views.open', VIEWS_OPEN.render(trigger_id=trigger_id, view=LEAVE_HISTORY_REQUEST_MODAL), user_id=user_id)
         callback_id = data.get('view', {}).get('callback_id')
         user_id = data.get('user', {}).get('id')
         return jsonify({"status": "ok"})
@@ -322,109 +304,20 @@ def handle_interactions():
             return jsonify({"status": "ok"})
         else:
             error_message = response
-            error_response = requests.post('https://slack.com/api/views.open', headers={
-                'Authorization': f'Bearer {slack_token}',
-                'Content-Type': 'application/json'
-            }, json={
-                "trigger_id": trigger_id,
-                "view": {
-                    "type": "modal",
-                    "callback_id": "error_modal",
-                    "title": {
-                        "type": "plain_text",
-                        "text": "Error"
-                    },
-                    "blocks": [
-                        {
-                            "type": "section",
-                            "block_id": "error_message",
-                            "text": {
-                                "type": "plain_text",
-                                "text": error_message
-                            }
-                        }
-                    ]
-                }
-            })
-            
-            if error_response.status_code == 200 and error_response.json().get('ok'):
-                return jsonify({"status": "error", "message": error_message})
-            else:
-                return jsonify({"status": "error", "message": "Failed to display error message"}), 500
+            slack_post_async('views.open', VIEWS_OPEN.render(
+                trigger_id=trigger_id, view=ERROR_MODAL.render(text=error_message)
+            ), user_id=user_id)
+            return jsonify({"status": "error", "message": error_message})
     if action_id in ["approve","decline"]:
         response = handle_interactive_message(data)
-        update_response = update_home_manager_ui(user_id, slack_token)
-        if "error" in response or update_response.status_code != 200:
-                return jsonify({"status": "error", "message": "Failed to update the home UI or send DM."}), 500
+        if "error" in response:
+            return jsonify({"status": "error", "message": response}), 500
+        enqueue_delivery(update_home_manager_ui, user_id, slack_token)
         return jsonify({"status": "ok"})
     if action_id == 'apply_leave': 
         trigger_id = data.get('trigger_id')  
         log.info("Opening leave modal")
-        modal_view = {
-            "type": "modal",
-            "callback_id": "apply_leave_modal",
-            "title": {
-                "type": "plain_text",
-                "text": "Apply for Leave"
-            },
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "start_date",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "Start Date"
-                    },
-                    "element": {
-                        "type": "datepicker",
-                        "action_id": "start_date"
-                    },
-                    "optional": False
-                },
-                {
-                    "type": "input",
-                    "block_id": "end_date",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "End Date"
-                    },
-                    "element": {
-                        "type": "datepicker",
-                        "action_id": "end_date"
-                    },
-                    "optional": False
-                },
-                {
-                    "type": "input",
-                    "block_id": "reason",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "Reason for Leave"
-                    },
-                    "element": {
-                        "type": "plain_text_input",
-                        "multiline": True,
-                        "action_id": "reason"
-                    },
-                    "optional": False
-                }
-            ],
-            "submit": {
-                "type": "plain_text",
-                "text": "Submit"
-            }
-        }
-        response = requests.post(
-            'https://slack.com/api/views.open',
-            headers={
-                'Authorization': f'Bearer {slack_token}',
-                'Content-Type': 'application/json; charset=utf-8'
-            },
-            json={
-                'trigger_id': trigger_id,
-                'view': modal_view
-            }
-        )
+        slack_post_async('views.open', VIEWS_OPEN.render(trigger_id=trigger_id, view=APPLY_LEAVE_MODAL), user_id=user_id)
         callback_id = data.get('view', {}).get('callback_id')
         user_id = data.get('user', {}).get('id')
         values = data.get('view', {}).get('state', {}).get('values', {})
@@ -433,61 +326,33 @@ def handle_interactions():
         trigger_id = data.get('trigger_id')
         user_id = data.get('user', {}).get('id')  
         log.info("Opening leave history modal")
-        leave_balance_message = view_leave_balance(user_id)
-        leave_history = view_past_leaves(user_id)
-        leave_entries = leave_history.split('\n')
-        blocks = [
-            {
-                "type": "section",
-                "block_id": "leave_balance",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": leave_balance_message
-                }
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "section",
-                "block_id": "leave_history_header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "Here is your leave history:"
-                }
-            }
-        ]
-        for idx, entry in enumerate(leave_entries):
-            blocks.append({
-                "type": "section",
-                "block_id": f"leave_entry_{idx}",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": entry
-                }
-            })
-        modal_view = {
-            "type": "modal",
-            "callback_id": "leave_history_modal",
-            "title": {
-                "type": "plain_text",
-                "text": "Leave History"
-            },
-            "blocks": blocks
-        }
-        response = requests.post(
-            'https://slack.com/api/views.open',
-            headers={
-                'Authorization': f'Bearer {slack_token}',
-                'Content-Type': 'application/json; charset=utf-8'
-            },
-            json={
-                'trigger_id': trigger_id,
-                'view': modal_view
-            }
-        )
-        if response.status_code != 200:
-            return jsonify({"status": "error", "message": response.text}), response.status_code
+        modal_view = build_leave_history_view(user_id, "Here is your leave history:", "leave_history_modal")
+        slack_post_async('views.open', {
+            'trigger_id': trigger_id,
+            'view': modal_view
+        }, user_id=user_id)
+        return jsonify({"status": "ok"})
+    if action_id in ("leave_history_next", "leave_history_first"):
+        slack_id, _, cursor = data['actions'][0].get('value', '').partition('|')
+        viewer = User.query.filter_by(slack_id=user_id).first()
+        # Other users' history is reachable only from the manager home
+        if not viewer or (slack_id != user_id and viewer.role != 'Manager'):
+            return jsonify({"status": "error", "message": "Access denied"}), 403
+        view = data.get('view', {})
+        if view.get('callback_id') == 'intern_leave_history_request':
+            user = User.query.filter_by(slack_id=slack_id).first()
+            header = f"Leave History for {user.name if user else slack_id}:"
+        else:
+            header = "Here is your leave history:"
+        try:
+            modal_view = build_leave_history_view(slack_id, header, view.get('callback_id', 'leave_history_modal'), cursor or None)
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid page"}), 400
+        slack_post_async('views.update', {
+            'view_id': view.get('id'),
+            'hash': view.get('hash'),
+            'view': modal_view
+        }, user_id=user_id)
         return jsonify({"status": "ok"})
     if action_id.startswith('cancel_'):
         leave_id = int(action_id.split('_')[1])
@@ -496,14 +361,11 @@ def handle_interactions():
         if not user:
             return jsonify({"status": "error", "message": "User not found"}), 404
         if user.role == 'Manager':
-            update_response = update_home_manager_ui(user_id, slack_token)
+            enqueue_delivery(update_home_manager_ui, user_id, slack_token)
         else:
-            update_response = update_home_ui(user_id, slack_token)
+            enqueue_delivery(update_home_ui, user_id, slack_token)
         response_message = f"Leave request (ID: {leave_id}) cancelled successfully. Leave days added back to your balance."
-        dm_response = send_dm_message(user_id, response_message)
-        if 'error' in dm_response or update_response.status_code != 200:
-            return jsonify({"status": "error", "message": "Failed to update the home UI or send DM."}), 500
-        
+        enqueue_delivery(send_dm_message, user_id, response_message)
         return jsonify({"status": "ok", "message": response_message})
 
 @bp.route('/slack/admin',methods=['POST'])
@@ -649,7 +511,10 @@ def handle_leave():
                 response = "Please provide a valid number corresponding to the leave you want to cancel."
 
     elif command == '/pastleaves':
-        response = view_past_leaves(user_id)
+        try:
+            response = view_past_leaves(user_id, text or None)
+        except ValueError:
+            response = "Please use the page reference shown under your leave history."
 
     elif command == '/leavebalance':
         response = view_leave_balance(user_id)
@@ -663,35 +528,32 @@ def handle_leave():
             channel_id = leave_request.channel_id
             message_ts = leave_request.message_ts
             updated_text = f"Leave request {leave_id} has been {action}d by <@{user_id}>."
-            updated_blocks = [
-                {
-                    "type": "section",
-                    "block_id": "section-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": updated_text
-                    }
-                },
-                {
-                    "type": "section",
-                    "block_id": "status-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Status:* {'Approved' if action == 'approve' else 'Declined'}"
-                    }
-                }
-            ]
-            update_message(channel_id, message_ts, updated_text, updated_blocks)
+            enqueue_decision_update(leave_id, channel_id, message_ts, updated_text, action == 'approve')
         except ValueError:
             response = "Please provide a valid leave ID."
 
     elif command == '/leavehistory':
-        intern_id = text.strip()
+        intern_id, _, cursor = text.strip().partition(' ')
         manager_mapping = ManagerMapping.query.filter_by(employee_id=intern_id).first()
         if not manager_mapping:
             response="Manager not found"
         else:
-            response = view_intern_leave_history(intern_id,manager_mapping.manager_id)
+            try:
+                response = view_intern_leave_history(intern_id,manager_mapping.manager_id,cursor.strip() or None)
+            except ValueError:
+                response = "Please use the page reference shown under the leave history."
+
+    elif command == '/leavedigest':
+        manager = User.query.filter_by(slack_id=user_id, role='Manager').first()
+        if not manager:
+            response = "Only managers can change how leave requests reach them."
+        elif text.lower() not in ('on', 'off'):
+            response = "Usage: /leavedigest on|off"
+        else:
+            set_digest_mode(user_id, text.lower() == 'on')
+            response = ("Digest mode on: new leave requests will arrive batched in one message."
+                        if text.lower() == 'on' else
+                        "Digest mode off: each new leave request will arrive as its own message.")
 
     elif command == '/viewpendingleaves':
         manager = User.query.filter_by(slack_id=user_id, role='Manager').first()
@@ -0,0 +1,175 @@
+# app/slack_async_manager.py
+import asyncio
+import atexit
+import json
+import os
+import ssl
+import threading
+import time
+from concurrent.futures import wait
+import certifi
+from .logger import log
+from .metrics_manager import observe_slack_call, slack_error_label
+from .slack_delivery_manager import enqueue_delivery
+from .slack_http_manager import (
+    NON_IDEMPOTENT_METHODS, SLACK_API_URL, get_bucket, get_retry_delay, incr_metric, should_retry_response
+)
+from .slack_message_manager import send_dm_message
+
+FAILURE_NOTICE = "Sorry, Slack could not show that window. Please try again."
+
+_loop = None
+_session = None
+_loop_lock = threading.Lock()
+# Calls scheduled but not finished yet, drained by close_async_session
+_pending = set()
+_pending_lock = threading.Lock()
+
+class SlackResponse:
+    """The parts of a requests.Response the Slack helpers read, filled from an aiohttp response."""
+
+    def __init__(self, status_code, text, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+        self.ok = status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+def _run_loop(loop, ready):
+    asyncio.set_event_loop(loop)
+
+    async def open_session():
+        global _session
+        import aiohttp  # Deferred so worker start-up does not pay for it until the first async Slack call
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv("SLACK_ASYNC_POOL_SIZE", "100")),
+            ssl=ssl.create_default_context(cafile=certifi.where())
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=float(os.getenv("SLACK_HTTP_CONNECT_TIMEOUT", "3.05")),
+            sock_read=float(os.getenv("SLACK_HTTP_READ_TIMEOUT", "10"))
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    loop.run_until_complete(open_session())
+    ready.set()
+    loop.run_forever()
+
+def get_event_loop():
+    """Starts (once) the background event loop that owns the shared aiohttp session."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                threading.Thread(target=_run_loop, args=(loop, ready), name="slack-async", daemon=True).start()
+                ready.wait()
+                _loop = loop
+                atexit.register(close_async_session)
+                log.info("Slack async I/O loop started.")
+    return _loop
+
+async def slack_api_call_async(api_method, json=None, params=None, token=None, http_method='POST'):
+    """aiohttp counterpart of slack_api_call, sharing its per-method rate limits, retry policy and metrics."""
+    import aiohttp
+    headers = {
+        'Authorization': f'Bearer {token or os.getenv("SLACK_BOT_TOKEN")}',
+    }
+    url = os.getenv("SLACK_API_URL", SLACK_API_URL) + api_method
+    body = {'json': json}
+    # Payloads rendered by block_template_manager are already JSON text
+    if isinstance(json, str):
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        body = {'data': json.encode('utf-8')}
+    max_retries = int(os.getenv("SLACK_HTTP_MAX_RETRIES", "3"))
+    attempt = 0
+    while True:
+        wait = get_bucket(api_method).reserve()
+        if wait > 0:
+            incr_metric("throttled")
+            incr_metric("throttled_seconds", wait)
+            await asyncio.sleep(wait)
+        incr_metric("calls")
+        started_at = time.perf_counter()
+        try:
+            async with _session.request(http_method, url, headers=headers, params=params, **body) as raw:
+                response = SlackResponse(raw.status, await raw.text(), raw.headers)
+            observe_slack_call(api_method, time.perf_counter() - started_at,
+                               slack_error_label(response.status_code, response.text.encode()))
+        except aiohttp.ClientConnectionError as e:
+            observe_slack_call(api_method, time.perf_counter() - started_at, type(e).__name__)
+            never_sent = isinstance(e, aiohttp.ConnectionTimeoutError)
+            if attempt >= max_retries or (api_method in NON_IDEMPOTENT_METHODS and not never_sent):
+                incr_metric("failed")
+                raise
+            delay = get_retry_delay(attempt)
+            log.warning(f"Slack {api_method} failed ({e}), retrying in {delay:.2f}s.")
+        else:
+            rate_limited = response.status_code == 429 or (
+                response.status_code == 200 and 'json' in response.headers.get('Content-Type', '')
+                and response.json().get('error') == 'ratelimited'
+            )
+            if not should_retry_response(api_method, response, rate_limited):
+                if rate_limited:
+                    incr_metric("rate_limited")
+                return response
+            if rate_limited:
+                incr_metric("rate_limited")
+            if attempt >= max_retries:
+                incr_metric("failed")
+                log.error(f"Slack {api_method} gave up after {attempt + 1} attempts: HTTP {response.status_code}")
+                return response
+            delay = get_retry_delay(attempt, response)
+            if rate_limited:
+                get_bucket(api_method).pause(delay)
+            log.warning(f"Slack {api_method} returned HTTP {response.status_code}, retrying in {delay:.2f}s.")
+        incr_metric("retried")
+        attempt += 1
+        await asyncio.sleep(delay)
+
+def _log_result(api_method, user_id, future):
+    with _pending_lock:
+        _pending.discard(future)
+    try:
+        response = future.result()
+        if response.status_code == 200 and response.json().get('ok'):
+            return
+        log.error(f"Slack {api_method} failed: {response.text}")
+    except Exception as e:
+        log.error(f"Slack {api_method} failed: {e}")
+    # The request was acknowledged long ago, so a DM is the only way left to tell the user
+    if user_id:
+        enqueue_delivery(send_dm_message, user_id, FAILURE_NOTICE)
+
+def slack_post_async(api_method, payload, token=None, user_id=None):
+    """Schedules a Slack POST on the async loop and returns a concurrent.futures.Future without blocking the caller.
+
+    If the call fails, `user_id` (when given) is sent a DM asking them to try again.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        slack_api_call_async(api_method, json=payload, token=token), get_event_loop()
+    )
+    with _pending_lock:
+        _pending.add(future)
+    future.add_done_callback(lambda done: _log_result(api_method, user_id, done))
+    return future
+
+def close_async_session(timeout=5):
+    """Waits up to `timeout` seconds for calls still in flight, then closes the session and stops the loop."""
+    global _loop, _session
+    if _loop is None:
+        return
+    with _pending_lock:
+        pending = list(_pending)
+    if pending:
+        _, not_done = wait(pending, timeout)
+        if not_done:
+            log.warning("Slack async shutdown timed out with %s calls in flight.", len(not_done))
+    if _session is not None:
+        asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout)
+        _session = None
+    _loop.call_soon_threadsafe(_loop.stop)
+    _loop = None
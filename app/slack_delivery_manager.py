@@ -0,0 +1,117 @@
+# app/slack_delivery_manager.py
+import atexit
+import queue
+import threading
+import time
+from .logger import log
+
+_STOP = object()
+
+_app = None
+_queue = None
+_workers = []
+_put_timeout = 0.5
+_metrics_lock = threading.Lock()
+_metrics = {
+    "enqueued": 0,
+    "completed": 0,
+    "failed": 0,
+    "ran_inline": 0,
+    "max_depth": 0,
+    "wait_seconds_total": 0.0
+}
+
+def _incr(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+def _run(func, args, kwargs):
+    try:
+        if _app is not None:
+            with _app.app_context():
+                func(*args, **kwargs)
+        else:
+            func(*args, **kwargs)
+        _incr("completed")
+    except Exception as e:
+        _incr("failed")
+        log.error(f"Delivery job {getattr(func, '__name__', func)} failed: {e}")
+
+def _worker(jobs):
+    while True:
+        item = jobs.get()
+        try:
+            if item is _STOP:
+                return
+            func, args, kwargs, queued_at = item
+            _incr("wait_seconds_total", time.monotonic() - queued_at)
+            _run(func, args, kwargs)
+        finally:
+            jobs.task_done()
+
+def init_delivery_queue(app):
+    """Starts the background workers that deliver Slack notifications, message updates and home-tab publishes."""
+    global _app, _queue, _put_timeout
+    if _queue is not None:
+        return
+    _app = app
+    _queue = queue.Queue(maxsize=app.config.get('SLACK_DELIVERY_QUEUE_SIZE', 1000))
+    _put_timeout = app.config.get('SLACK_DELIVERY_PUT_TIMEOUT', 0.5)
+    worker_count = app.config.get('SLACK_DELIVERY_WORKERS', 4)
+    for index in range(worker_count):
+        worker = threading.Thread(target=_worker, args=(_queue,), name=f"slack-delivery-{index}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    atexit.register(drain_delivery_queue)
+    log.info("Slack delivery queue started with %s workers.", worker_count)
+
+def enqueue_delivery(func, *args, **kwargs):
+    """Queues a Slack call for a background worker. Falls back to running it inline when the queue is not started or stays full."""
+    if _queue is None:
+        _incr("ran_inline")
+        _run(func, args, kwargs)
+        return False
+    try:
+        _queue.put((func, args, kwargs, time.monotonic()), timeout=_put_timeout)
+    except queue.Full:
+        log.warning("Slack delivery queue is full, delivering %s inline.", getattr(func, '__name__', func))
+        _incr("ran_inline")
+        _run(func, args, kwargs)
+        return False
+    with _metrics_lock:
+        _metrics["enqueued"] += 1
+        _metrics["max_depth"] = max(_metrics["max_depth"], _queue.qsize())
+    return True
+
+def get_delivery_metrics():
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["depth"] = _queue.qsize() if _queue is not None else 0
+    metrics["capacity"] = _queue.maxsize if _queue is not None else 0
+    metrics["workers"] = len(_workers)
+    return metrics
+
+def drain_delivery_queue(timeout=10):
+    """Stops accepting work, waits for queued deliveries to finish and joins the workers."""
+    global _queue
+    if _queue is None:
+        return
+    pending = _queue
+    _queue = None
+    deadline = time.monotonic() + timeout
+    for _ in _workers:
+        # A full queue must not hang shutdown: the workers are daemons and die with the process
+        try:
+            pending.put(_STOP, timeout=max(0, deadline - time.monotonic()))
+        except queue.Full:
+            log.warning("Slack delivery queue still full at shutdown, dropping %s items.", pending.qsize())
+            _workers.clear()
+            return
+    for worker in _workers:
+        worker.join(max(0, deadline - time.monotonic()))
+    alive = [worker.name for worker in _workers if worker.is_alive()]
+    if alive:
+        log.warning("Slack delivery queue drain timed out with %s items left.", pending.qsize())
+    else:
+        log.info("Slack delivery queue drained.")
+    _workers.clear()
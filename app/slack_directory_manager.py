@@ -0,0 +1,110 @@
+# app/slack_directory_manager.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from .logger import log
+from .slack_http_manager import slack_get
+from .slack_delivery_manager import enqueue_delivery
+
+DIRECTORY_CACHE_SIZE = int(os.getenv("DIRECTORY_CACHE_SIZE", "10000"))
+DIRECTORY_TTL = float(os.getenv("DIRECTORY_TTL", "3600"))
+
+# user_id -> (fetched_at, Slack user object), least recently used first
+_entries = OrderedDict()
+# user_id -> on_fetched callbacks waiting for the background fetch already scheduled for it
+_pending = {}
+_lock = threading.Lock()
+
+def _store(user):
+    with _lock:
+        _entries[user['id']] = (time.monotonic(), user)
+        _entries.move_to_end(user['id'])
+        while len(_entries) > DIRECTORY_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+def fetch_user(user_id):
+    """Blocking users.info lookup that refreshes the cache. Only called off the request path."""
+    try:
+        data = slack_get('users.info', {'user': user_id}).json()
+    except Exception as e:
+        log.error(f"users.info failed for {user_id}: {e}")
+        return None
+    if not data.get('ok') or not data.get('user'):
+        return None
+    _store(data['user'])
+    return data['user']
+
+def _schedule_fetch(user_id, on_fetched=None):
+    with _lock:
+        scheduled = user_id in _pending
+        callbacks = _pending.setdefault(user_id, [])
+        if on_fetched:
+            callbacks.append(on_fetched)
+        if scheduled:
+            return
+
+    def refresh():
+        try:
+            user = fetch_user(user_id)
+        finally:
+            with _lock:
+                callbacks = _pending.pop(user_id, [])
+        if not user:
+            return
+        for callback in callbacks:
+            try:
+                callback(user)
+            except Exception as e:
+                log.error(f"Directory callback {getattr(callback, '__name__', callback)} failed for {user_id}: {e}")
+
+    enqueue_delivery(refresh)
+
+def lookup_user(user_id, on_fetched=None):
+    """Returns the cached Slack user without blocking. Misses and expired entries are refreshed in the background."""
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry:
+            _entries.move_to_end(user_id)
+    if entry is None or time.monotonic() - entry[0] > DIRECTORY_TTL:
+        _schedule_fetch(user_id, on_fetched)
+    return entry[1] if entry else None
+
+def get_display_name(user, default):
+    if not user:
+        return default
+    return user.get('real_name') or user.get('profile', {}).get('real_name') or user.get('name') or default
+
+def sync_directory(page_size=200):
+    """Seeds the cache from a paginated users.list walk and returns every member seen."""
+    members = []
+    cursor = None
+    while True:
+        params = {'limit': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        data = slack_get('users.list', params).json()
+        if not data.get('ok'):
+            raise RuntimeError(f"users.list failed: {data.get('error')}")
+        for user in data.get('members', []):
+            _store(user)
+        members.extend(data.get('members', []))
+        cursor = data.get('response_metadata', {}).get('next_cursor')
+        if not cursor:
+            break
+    log.info("Slack directory synced: %s users.", len(members))
+    return members
+
+def start_directory_refresher(interval):
+    """Re-syncs the directory every `interval` seconds on a daemon thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                sync_directory()
+            except Exception as e:
+                log.error(f"Slack directory sync failed: {e}")
+
+    threading.Thread(target=run, name="slack-directory", daemon=True).start()
+    return stop
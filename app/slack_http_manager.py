@@ -0,0 +1,215 @@
+# app/slack_http_manager.py
+import os
+import random
+import threading
+import time
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from .logger import log
+from .metrics_manager import observe_slack_call, slack_error_label
+
+SLACK_API_URL = "https://slack.com/api/"
+
+# Requests per minute for each Slack rate-limit tier, see https://api.slack.com/apis/rate-limits
+SLACK_TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+SLACK_METHOD_LIMITS = {
+    'chat.postMessage': 60,  # "special" tier, roughly one message per second
+    'chat.update': SLACK_TIER_LIMITS[3],
+    'conversations.open': SLACK_TIER_LIMITS[3],
+    'users.info': SLACK_TIER_LIMITS[4],
+    'users.list': SLACK_TIER_LIMITS[2],
+    'views.open': SLACK_TIER_LIMITS[4],
+    'views.publish': SLACK_TIER_LIMITS[4],
+    'views.update': SLACK_TIER_LIMITS[4],
+}
+DEFAULT_METHOD_LIMIT = SLACK_TIER_LIMITS[3]
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Calls that act twice if sent twice. A dropped connection or a 5xx may come after Slack acted on them, so they are
+# retried only when the request provably never ran: a connect timeout, or a 429 with Retry-After
+NON_IDEMPOTENT_METHODS = {'chat.postMessage', 'views.open'}
+
+_session = None
+_session_lock = threading.Lock()
+_buckets = {}
+_buckets_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "calls": 0,
+    "throttled": 0,
+    "throttled_seconds": 0.0,
+    "rate_limited": 0,
+    "retried": 0,
+    "failed": 0
+}
+
+class TokenBucket:
+    """Refills `rate_per_minute` tokens a minute up to a burst of the same size."""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes one token and returns how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.tokens = min(self.tokens, 0.0)
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def incr_metric(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+def get_bucket(api_method):
+    with _buckets_lock:
+        bucket = _buckets.get(api_method)
+        if bucket is None:
+            # SLACK_RATE_LIMIT_SCALE lifts the limits for load tests against a fake Slack API
+            scale = float(os.getenv("SLACK_RATE_LIMIT_SCALE", "1"))
+            bucket = _buckets[api_method] = TokenBucket(SLACK_METHOD_LIMITS.get(api_method, DEFAULT_METHOD_LIMIT) * scale)
+        return bucket
+
+def get_slack_http_metrics():
+    with _metrics_lock:
+        return dict(_metrics)
+
+def get_http_session():
+    """Returns the process-wide keep-alive session shared by every Slack Web API call."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = int(os.getenv("SLACK_HTTP_POOL_SIZE", "20"))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.verify = certifi.where()
+                _session = session
+                log.info("Slack HTTP session initialized with pool size %s.", pool_size)
+    return _session
+
+def close_http_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def get_http_timeout():
+    return (
+        float(os.getenv("SLACK_HTTP_CONNECT_TIMEOUT", "3.05")),
+        float(os.getenv("SLACK_HTTP_READ_TIMEOUT", "10"))
+    )
+
+def get_retry_delay(attempt, response=None):
+    """Honours Slack's Retry-After header, otherwise uses exponential backoff with full jitter."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after) + random.uniform(0, 0.5)
+        except ValueError:
+            pass
+    base = float(os.getenv("SLACK_HTTP_BACKOFF_BASE", "0.5"))
+    return random.uniform(0, base * (2 ** attempt))
+
+def _is_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    if response.status_code == 200 and 'json' in response.headers.get('Content-Type', ''):
+        try:
+            return response.json().get('error') == 'ratelimited'
+        except ValueError:
+            return False
+    return False
+
+def should_retry_response(api_method, response, rate_limited):
+    if api_method in NON_IDEMPOTENT_METHODS:
+        return rate_limited and bool(response.headers.get('Retry-After'))
+    return rate_limited or response.status_code in RETRYABLE_STATUS_CODES
+
+def _send(api_method, **kwargs):
+    bucket = get_bucket(api_method)
+    wait = bucket.reserve()
+    if wait > 0:
+        incr_metric("throttled")
+        incr_metric("throttled_seconds", wait)
+        time.sleep(wait)
+    incr_metric("calls")
+    started_at = time.perf_counter()
+    try:
+        response = get_http_session().request(**kwargs)
+    except requests.exceptions.RequestException as e:
+        observe_slack_call(api_method, time.perf_counter() - started_at, type(e).__name__)
+        raise
+    observe_slack_call(api_method, time.perf_counter() - started_at, slack_error_label(response.status_code, response.content))
+    return response
+
+def slack_api_call(api_method, json=None, params=None, token=None, http_method='POST'):
+    headers = {
+        'Authorization': f'Bearer {token or os.getenv("SLACK_BOT_TOKEN")}',
+    }
+    if json is not None:
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+    request_kwargs = {
+        "method": http_method,
+        "url": os.getenv("SLACK_API_URL", SLACK_API_URL) + api_method,
+        "headers": headers,
+        "json": json,
+        "params": params,
+        "timeout": get_http_timeout()
+    }
+    # Payloads rendered by block_template_manager are already JSON text
+    if isinstance(json, str):
+        request_kwargs["data"] = json.encode('utf-8')
+        request_kwargs["json"] = None
+    max_retries = int(os.getenv("SLACK_HTTP_MAX_RETRIES", "3"))
+    attempt = 0
+    while True:
+        try:
+            response = _send(api_method, **request_kwargs)
+        except requests.exceptions.ConnectionError as e:
+            never_sent = isinstance(e, requests.exceptions.ConnectTimeout)
+            if attempt >= max_retries or (api_method in NON_IDEMPOTENT_METHODS and not never_sent):
+                incr_metric("failed")
+                raise
+            delay = get_retry_delay(attempt)
+            log.warning(f"Slack {api_method} failed ({e}), retrying in {delay:.2f}s.")
+        else:
+            rate_limited = _is_rate_limited(response)
+            if not should_retry_response(api_method, response, rate_limited):
+                if rate_limited:
+                    incr_metric("rate_limited")
+                return response
+            if rate_limited:
+                incr_metric("rate_limited")
+            if attempt >= max_retries:
+                incr_metric("failed")
+                log.error(f"Slack {api_method} gave up after {attempt + 1} attempts: HTTP {response.status_code}")
+                return response
+            delay = get_retry_delay(attempt, response)
+            if rate_limited:
+                get_bucket(api_method).pause(delay)
+            log.warning(f"Slack {api_method} returned HTTP {response.status_code}, retrying in {delay:.2f}s.")
+        incr_metric("retried")
+        attempt += 1
+        time.sleep(delay)
+
+def slack_post(api_method, payload, token=None):
+    return slack_api_call(api_method, json=payload, token=token)
+
+def slack_get(api_method, params=None, token=None):
+    return slack_api_call(api_method, params=params, token=token, http_method='GET')
@@ -1,7 +1,7 @@
 import requests
 from .models import LeaveRequest
-from .slack_message_manager import update_message
 from .manager import approve_or_decline_leave
+from .digest_manager import enqueue_decision_update
 
 def handle_interactive_message(payload):
     try:
@@ -22,25 +22,7 @@ def handle_interactive_message(payload):
             action_type = 'approve' if action_id == 'approve' else 'decline'
             response = approve_or_decline_leave(payload['user']['id'], leave_id, action_type)
             updated_text = f"Leave request {leave_id} has been {action_type}d by <@{payload['user']['id']}>."
-            updated_blocks = [
-                {
-                    "type": "section",
-                    "block_id": "section-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": updated_text
-                    }
-                },
-                {
-                    "type": "section",
-                    "block_id": "status-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Status:* {'Approved' if action_id == 'approve' else 'Declined'}"
-                    }
-                }
-            ]
-            update_message(channel_id, message_ts, updated_text, updated_blocks)
+            enqueue_decision_update(leave_id, channel_id, message_ts, updated_text, action_id == 'approve')
             return response
         else:
             return "Unknown action."
@@ -57,25 +39,7 @@ def handle_interactive_message_calendar(action,leave_id):
             action_type = 'approve' if action == 'approve' else 'decline'
             response = approve_or_decline_leave(manager_id, leave_id, action_type)
             updated_text = f"Leave request {leave_id} has been {action_type}d by <@{manager_id}>."
-            updated_blocks = [
-                {
-                    "type": "section",
-                    "block_id": "section-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": updated_text
-                    }
-                },
-                {
-                    "type": "section",
-                    "block_id": "status-identifier",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Status:* {'Approved' if action == 'approve' else 'Declined'}"
-                    }
-                }
-            ]
-            update_message(channel_id, message_ts, updated_text, updated_blocks)
+            enqueue_decision_update(leave_id, channel_id, message_ts, updated_text, action == 'approve')
             return response
         else:
             return "Unknown action."
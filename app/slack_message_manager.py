@@ -1,84 +1,48 @@
 import requests
 from .logger import log
-import os
-import certifi
 from .models import db, LeaveRequest
-import json
-
-slack_token = os.getenv("SLACK_BOT_TOKEN")
+from .slack_http_manager import slack_post
+from .slack_directory_manager import lookup_user, get_display_name
+from .coverage_manager import get_coverage_report, format_coverage_report
+from .block_template_manager import (
+    CHAT_POST_MESSAGE, CHAT_UPDATE, COVERAGE_SECTION, LEAVE_REQUEST_ACTIONS, LEAVE_REQUEST_MESSAGE, Raw, block_list
+)
 
 def send_dm_message(user_id, text):
-    response = requests.post(
-        'https://slack.com/api/conversations.open',
-        headers={
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/json; charset=utf-8'
-        },
-        json={
-            'users': user_id
-        }
-    )
+    response = slack_post('conversations.open', {
+        'users': user_id
+    })
     if response.status_code != 200:
         return response.text
     channel_id = response.json().get('channel', {}).get('id')
     if not channel_id:
         return "Failed to retrieve DM channel ID."
-    response = requests.post(
-        'https://slack.com/api/chat.postMessage',
-        headers={
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/json; charset=utf-8'
-        },
-        json={
-            'channel': channel_id,
-            'blocks': [
-                {
-                    "type": "section",
-                    "block_id": "cancel_confirmation",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": text
-                    }
+    response = slack_post('chat.postMessage', {
+        'channel': channel_id,
+        'blocks': [
+            {
+                "type": "section",
+                "block_id": "cancel_confirmation",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": text
                 }
-            ]
-        }
-    )
+            }
+        ]
+    })
     return response.text
 
-def get_user_name(user_id):
-    response = requests.get(
-        'https://slack.com/api/users.info',
-        headers={
-            'Authorization': f'Bearer {slack_token}'
-        },
-        params={
-            'user': user_id
-        }
-    )
-    user_info = response.json()
-    if user_info.get('ok'):
-        return user_info.get('user', {}).get('real_name', 'User')
-    else:
-        return 'User'
+def get_user_name(user_id, default='User', on_fetched=None):
+    return get_display_name(lookup_user(user_id, on_fetched), default)
 
 def update_message(channel_id, message_ts, updated_text, updated_blocks):
     try:
-        url = "https://slack.com/api/chat.update"
-        headers = {
-            "Authorization": f"Bearer {slack_token}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "channel": channel_id,
-            "ts": message_ts,
-            "text": updated_text,
-            "blocks": updated_blocks
-        }
-        response = requests.post(url, headers=headers, json=payload, verify=certifi.where())
+        payload = CHAT_UPDATE.render(channel=channel_id, ts=message_ts, text=updated_text, blocks=updated_blocks)
+        response = slack_post('chat.update', payload)
         if not response.ok or not response.json().get('ok', False):
             raise Exception(f"Slack API Error: {response.json().get('error')}")
 
-        log.info(f"Message updated successfully: {response.text}")
+        log.info("Message updated successfully: %s/%s", channel_id, message_ts)
         return response.text
 
     except Exception as e:
@@ -86,11 +50,6 @@ def update_message(channel_id, message_ts, updated_text, updated_blocks):
         raise
 
 def update_message_for_manager(channel_id, message_ts, user_name):
-    headers = {
-        'Authorization': f'Bearer {slack_token}',
-        'Content-Type': 'application/json'
-    }
-    
     updated_message = {
         "channel": channel_id,
         "ts": message_ts,
@@ -105,7 +64,7 @@ def update_message_for_manager(channel_id, message_ts, user_name):
         ]
     }
 
-    response = requests.post('https://slack.com/api/chat.update', headers=headers, json=updated_message)
+    response = slack_post('chat.update', updated_message)
     
     if not response.ok:
         raise Exception(f"Failed to update message: {response.text}")
@@ -113,62 +72,32 @@ def update_message_for_manager(channel_id, message_ts, user_name):
     return response
  
 def send_message_to_manager(slack_id, leave_id, message):
-    url = "https://slack.com/api/chat.postMessage"
-    headers = {
-        "Authorization": f"Bearer {slack_token}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "channel": slack_id,
-        "text": message,
-        "blocks": [
-            {
-                "type": "section",
-                "block_id": "section-identifier",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": message
-                }
-            },
-            {
-                "type": "actions",
-                "block_id": "actions-identifier",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Approve",
-                            "emoji": True
-                        },
-                        "action_id": "approve",
-                        "value": str(leave_id) 
-                    },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Decline",
-                            "emoji": True
-                        },
-                        "action_id": "decline",
-                        "value": str(leave_id) 
-                    }
-                ]
-            }
-        ]
-    }
+    leave_request = LeaveRequest.query.get(leave_id)
+    coverage = Raw('[]')
+    if leave_request:
+        try:
+            coverage = COVERAGE_SECTION.render(text=format_coverage_report(get_coverage_report(leave_request)))
+        except Exception as e:
+            # The approval request matters more than the coverage summary; a failed query leaves the session
+            # unusable, so roll it back before the message_ts commit below
+            db.session.rollback()
+            log.error(f"Team coverage lookup failed for leave {leave_id}: {e}")
+    blocks = block_list(
+        LEAVE_REQUEST_MESSAGE.render(text=message),
+        coverage,
+        LEAVE_REQUEST_ACTIONS.render(leave_id=str(leave_id))
+    )
+    payload = CHAT_POST_MESSAGE.render(channel=slack_id, text=message, blocks=blocks)
 
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload), verify=certifi.where())
+        response = slack_post('chat.postMessage', payload)
         response.raise_for_status()
         response_data = response.json()
         if not response_data.get("ok"):
             raise Exception(f"Slack API Error: {response_data.get('error')}")
         channel_id = response_data.get('channel')
         message_ts = response_data.get('ts')
-        log.info(f"Message sent to manager successfully: {response_data}")
-        leave_request = LeaveRequest.query.get(leave_id)
+        log.info("Message sent to manager successfully: %s/%s", channel_id, message_ts)
         if leave_request:
             leave_request.channel_id = channel_id
             leave_request.message_ts = message_ts
@@ -184,24 +113,19 @@ def send_message_to_manager(slack_id, leave_id, message):
         raise
 
 def send_message_from_manager(slack_id, message):
-    url = "https://slack.com/api/chat.postMessage"
-    headers = {
-        "Authorization": f"Bearer {slack_token}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "channel": slack_id,
         "text": message
     }
     try:
-        response = requests.post(url, headers=headers, json=payload, verify=certifi.where())
+        response = slack_post('chat.postMessage', payload)
         response.raise_for_status()
         response_data = response.json()
         
         if not response_data.get("ok"):
             raise Exception(f"Slack API Error: {response_data.get('error')}")
         
-        log.info(f"Message sent successfully: {response_data}")
+        log.info("Message sent successfully to %s", slack_id)
         return response_data
 
     except requests.exceptions.RequestException as e:
@@ -1,10 +1,9 @@
-import requests
 from .logger import log
-from .models import User
+from .models import User, ManagerMapping
 from .slack_ui_manager import format_intern_users_for_modal
-import os
-
-slack_token = os.getenv("SLACK_BOT_TOKEN")
+from .slack_async_manager import slack_post_async
+from .history_manager import get_leave_history_page
+from .intern import view_leave_balance
 
 def open_intern_users_modal(trigger_id, slack_id):
     """Opens a modal displaying intern users for a given manager."""
@@ -13,17 +12,16 @@ def open_intern_users_modal(trigger_id, slack_id):
         log.error("Manager not found.")
         return "Manager not found."
 
-    intern_users = [mapping.employee for mapping in manager.managed_employees]
+    intern_users = User.query.join(ManagerMapping, ManagerMapping.employee_id == User.slack_id).filter(
+        ManagerMapping.manager_id == manager.slack_id
+    ).all()
     if not intern_users:
         log.info("No intern users found for this manager.")
         return "No intern users found for this manager."
 
     blocks = format_intern_users_for_modal(intern_users)
     
-    response = requests.post('https://slack.com/api/views.open', headers={
-        'Authorization': f'Bearer {slack_token}',
-        'Content-Type': 'application/json'
-    }, json={
+    slack_post_async('views.open', {
         "trigger_id": trigger_id,
         "view": {
             "type": "modal",
@@ -34,11 +32,76 @@ def open_intern_users_modal(trigger_id, slack_id):
             },
             "blocks": blocks
         }
-    })
-    
-    if response.status_code == 200 and response.json().get('ok'):
-        log.info("Modal opened successfully.")
-        return "ok"
-    else:
-        log.error(f"Failed to open modal: {response.text}")
-        return "no"
+    }, user_id=slack_id)
+    return "ok"
+
+def build_leave_history_view(slack_id, header, callback_id, cursor=None):
+    """One page of a user's leave history as a modal, with Next page / Back to newest buttons when there is more."""
+    leaves, next_cursor = get_leave_history_page(slack_id, cursor)
+    blocks = [
+        {
+            "type": "section",
+            "block_id": "leave_balance",
+            "text": {
+                "type": "mrkdwn",
+                "text": view_leave_balance(slack_id)
+            }
+        },
+        {
+            "type": "divider"
+        },
+        {
+            "type": "section",
+            "block_id": "leave_history_header",
+            "text": {
+                "type": "plain_text",
+                "text": header
+            }
+        }
+    ]
+    entries = [f"Leave from {leave.start_date} to {leave.end_date}: {leave.status.value}" for leave in leaves]
+    for idx, entry in enumerate(entries or ["No leave history found"]):
+        blocks.append({
+            "type": "section",
+            "block_id": f"leave_entry_{idx}",
+            "text": {
+                "type": "mrkdwn",
+                "text": entry
+            }
+        })
+    buttons = []
+    if cursor:
+        buttons.append({
+            "type": "button",
+            "text": {
+                "type": "plain_text",
+                "text": "Back to newest"
+            },
+            "action_id": "leave_history_first",
+            "value": f"{slack_id}|"
+        })
+    if next_cursor:
+        buttons.append({
+            "type": "button",
+            "text": {
+                "type": "plain_text",
+                "text": "Next page"
+            },
+            "action_id": "leave_history_next",
+            "value": f"{slack_id}|{next_cursor}"
+        })
+    if buttons:
+        blocks.append({
+            "type": "actions",
+            "block_id": "leave_history_pages",
+            "elements": buttons
+        })
+    return {
+        "type": "modal",
+        "callback_id": callback_id,
+        "title": {
+            "type": "plain_text",
+            "text": "Leave History"
+        },
+        "blocks": blocks
+    }
@@ -1,180 +1,72 @@
 from .logger import log
 from .manager import view_all_pending_leaves_ui
 from .intern import view_pending_leaves_ui
-import requests
+from .slack_http_manager import slack_post
+from .calendar_manager import get_leave_version
+from .db_manager import read_replica
+from .block_template_manager import (
+    HOME_INTERN_HEADER, HOME_MANAGER_HEADER, MANAGER_OWN_LEAVES_HEADER, VIEWS_PUBLISH_HOME, block_list
+)
+from collections import OrderedDict
+import hashlib
+import os
+import threading
 
-def default_home_ui():
-    blocks = [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "Hello, How can I help you today?"
-            }
-        },
-        {
-            "type": "divider"
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "Apply leave",
-                        "emoji": True
-                    },
-                    "action_id": "apply_leave",
-                    "style": "primary"  
-                },
-                {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "View leave history",
-                        "emoji": True
-                    },
-                    "action_id": "view_leave_history"
-                }
-            ]
-        }
-    ]
-    return blocks
+HOME_VIEW_CACHE_SIZE = int(os.getenv("HOME_VIEW_CACHE_SIZE", "5000"))
 
-def default_home_manager_ui():
-    blocks = [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "Hello, How can I help you today?"
-            }
-        },
-        {
-            "type": "divider"
-        }
-    ]
-    blocks.append({
-        "type": "actions",
-        "elements": [
-            {
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "Apply leave",
-                    "emoji": True
-                },
-                "action_id": "apply_leave",
-                "style": "primary"
-            },
-            {
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "View Users",
-                    "emoji": True
-                },
-                "action_id": "view_users",
-                "style": "primary"
-            },
-            {
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "View Users Leave History",
-                    "emoji": True
-                },
-                "action_id": "view_user_leave_history"
-            },
-            {
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "View calendar",
-                    "emoji": True
-                },
-                "action_id": "view_calendar"
-            },
-            {
-                    "type": "button",
-                    "text": {
-                        "type": "plain_text",
-                        "text": "View my leave history",
-                        "emoji": True
-                    },
-                    "action_id": "view_leave_history"
-                }
-        ]
-    })
-    return blocks
-    
-def update_home_manager_ui(user_id, slack_token):
-    existing_blocks = default_home_manager_ui().copy()
-    existing_blocks.append({
-        "type": "section",
-        "block_id": "pending_leaves_header",
-        "text": {
-            "type": "plain_text",
-            "text": "Pending Leave Requests"
-        }
-    })
-    pending_leaves_blocks = view_all_pending_leaves_ui(user_id)
-    existing_blocks = existing_blocks + pending_leaves_blocks
-    existing_blocks.append({
-        "type": "section",
-        "block_id": "manager_pending_leaves_header",
-        "text": {
-            "type": "plain_text",
-            "text": "Your Pending Leaves"
-        }
-    })
+# user_id -> rendered home view, its leave-version key, and the digest last published to Slack
+_home_views = OrderedDict()
+_home_views_lock = threading.Lock()
 
-    manager_pending_leaves = view_pending_leaves_ui(user_id)
-    updated_blocks = existing_blocks + manager_pending_leaves
-    response = requests.post(
-        'https://slack.com/api/views.publish',
-        headers={
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/json'
-        },
-        json={
-            'user_id': user_id,
-            'view': {
-                'type': 'home',
-                'blocks': updated_blocks
-            }
-        }
+def render_home_manager_blocks(user_id):
+    return block_list(
+        HOME_MANAGER_HEADER,
+        view_all_pending_leaves_ui(user_id),
+        MANAGER_OWN_LEAVES_HEADER,
+        view_pending_leaves_ui(user_id)
     )
+
+def render_home_blocks(user_id):
+    return block_list(HOME_INTERN_HEADER, view_pending_leaves_ui(user_id))
+
+def get_home_view(user_id, kind, render):
+    """Returns (blocks JSON, digest) for a user's home tab, re-rendering only when their leave version has moved."""
+    cache_key = (kind, get_leave_version(user_id))
+    with _home_views_lock:
+        entry = _home_views.get(user_id)
+        if entry and entry["key"] == cache_key:
+            _home_views.move_to_end(user_id)
+            return entry["blocks"], entry["digest"]
+    with read_replica(user_id, cache_key[1]):
+        blocks = render(user_id)
+    digest = hashlib.sha256(blocks.encode()).hexdigest()
+    with _home_views_lock:
+        published = _home_views.get(user_id, {}).get("published")
+        _home_views[user_id] = {"key": cache_key, "blocks": blocks, "digest": digest, "published": published}
+        _home_views.move_to_end(user_id)
+        while len(_home_views) > HOME_VIEW_CACHE_SIZE:
+            _home_views.popitem(last=False)
+    return blocks, digest
+
+def publish_home_view(user_id, blocks, digest, slack_token):
+    with _home_views_lock:
+        if _home_views.get(user_id, {}).get("published") == digest:
+            log.info("Home view for %s unchanged, skipping publish.", user_id)
+            return None
+    response = slack_post('views.publish', VIEWS_PUBLISH_HOME.render(user_id=user_id, blocks=blocks), token=slack_token)
+    if response.status_code == 200 and response.json().get('ok'):
+        with _home_views_lock:
+            if user_id in _home_views:
+                _home_views[user_id]["published"] = digest
     return response
 
+def update_home_manager_ui(user_id, slack_token):
+    blocks, digest = get_home_view(user_id, 'manager', render_home_manager_blocks)
+    return publish_home_view(user_id, blocks, digest, slack_token)
+
 def update_home_ui(user_id, slack_token):
-    existing_blocks = default_home_ui().copy()
-    existing_blocks.append({
-        "type": "section",
-        "block_id": "pending_leaves_header",
-        "text": {
-            "type": "plain_text",
-            "text": "Pending Leaves"
-        }
-    })
-    pending_leaves_blocks = view_pending_leaves_ui(user_id)
-    updated_blocks = existing_blocks + pending_leaves_blocks 
-    response = requests.post(
-        'https://slack.com/api/views.publish',
-        headers={
-            'Authorization': f'Bearer {slack_token}',
-            'Content-Type': 'application/json'
-        },
-        json={
-            'user_id': user_id,
-            'view': {
-                'type': 'home',
-                'blocks': updated_blocks
-            }
-        }
-    )
-    return response
+    blocks, digest = get_home_view(user_id, 'intern', render_home_blocks)
+    return publish_home_view(user_id, blocks, digest, slack_token)
 
 def format_intern_users_for_modal(intern_users):
     blocks = [
@@ -1,20 +1,88 @@
 # app/user_manager.py
+import threading
 from datetime import datetime
+from sqlalchemy import case, func, update
 from .models import db, User
 from .logger import log
 
-def update_manager_leave_balances():
-    current_year = datetime.now().strftime('%Y')
+INTERN_MONTHLY_BALANCE = 2
+MANAGER_YEARLY_BALANCE = 14
+MANAGER_MAX_BALANCE = 20
 
+def is_balance_stale(user, now=None):
+    now = now or datetime.now()
+    if user.role == 'Intern':
+        return user.last_reset_month != now.strftime('%Y-%m')
+    if user.role == 'Manager':
+        return user.last_reset_month.split('-')[0] != now.strftime('%Y')
+    return False
+
+def reset_leave_balances(now=None, slack_id=None):
+    """Resets intern balances monthly and manager balances yearly with one UPDATE per role in a single transaction.
+
+    Idempotent: rows already reset for the current period are left untouched. With `slack_id`, only that
+    user's row is considered. Returns the rows touched per role.
+    """
+    now = now or datetime.now()
+    current_month = now.strftime('%Y-%m')
+    current_year = now.strftime('%Y')
+    scope = [User.slack_id == slack_id] if slack_id is not None else []
     try:
-        managers = User.query.filter_by(role="Manager").all()
-        for manager in managers:
-            last_reset_year = manager.last_reset_month.split('-')[0]
-            if last_reset_year != current_year:  # Check if the balance needs to be updated
-                # Update balance to 14 + any remaining balance from the previous year
-                manager.leave_balance = 14 + manager.leave_balance
-                manager.last_reset_month = current_year  # Update the last reset year
-                db.session.commit()
-        log.info("Manager leave balances updated.")
+        interns = db.session.execute(
+            update(User)
+            .where(User.role == 'Intern', User.last_reset_month != current_month, *scope)
+            .values(leave_balance=INTERN_MONTHLY_BALANCE, last_reset_month=current_month)
+            .execution_options(synchronize_session=False)
+        )
+        # Managers carry over unused leave, capped at MANAGER_MAX_BALANCE
+        carried_over = MANAGER_YEARLY_BALANCE + case((User.leave_balance > 0, User.leave_balance), else_=0)
+        managers = db.session.execute(
+            update(User)
+            .where(User.role == 'Manager', func.substr(User.last_reset_month, 1, 4) != current_year, *scope)
+            .values(
+                leave_balance=case((carried_over > MANAGER_MAX_BALANCE, MANAGER_MAX_BALANCE), else_=carried_over),
+                last_reset_month=current_year
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
     except Exception as e:
-        log.error(f"Error updating manager leave balances: {e}")
+        db.session.rollback()
+        log.error(f"Error resetting leave balances: {e}")
+        raise
+    touched = {"Intern": interns.rowcount, "Manager": managers.rowcount}
+    log.info("Leave balances reset: %s", touched)
+    return touched
+
+def debit_leave_balance(slack_id, days):
+    """Atomically takes `days` from a balance that covers them. Returns False (and changes nothing) otherwise.
+
+    The conditional UPDATE also locks the user's row (Postgres) or the database (SQLite) until the caller
+    commits or rolls back, which serialises concurrent applications from the same user.
+    """
+    debited = User.query.filter(User.slack_id == slack_id, User.leave_balance >= days).update(
+        {User.leave_balance: User.leave_balance - days}, synchronize_session=False
+    )
+    return debited == 1
+
+def credit_leave_balance(slack_id, days, max_balance=None):
+    """Atomically gives `days` back, optionally capped at `max_balance`."""
+    credited = User.leave_balance + days
+    if max_balance is not None:
+        credited = case((credited > max_balance, max_balance), else_=credited)
+    User.query.filter(User.slack_id == slack_id).update({User.leave_balance: credited}, synchronize_session=False)
+
+def start_balance_reset_scheduler(app, interval):
+    """Runs reset_leave_balances every `interval` seconds on a daemon thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    reset_leave_balances()
+                except Exception as e:
+                    log.error(f"Scheduled leave balance reset failed: {e}")
+
+    threading.Thread(target=run, name="balance-reset", daemon=True).start()
+    return stop
@@ -0,0 +1,25 @@
+# ASGI entry point for production serving under Hypercorn:
+#   hypercorn asgi:app --bind 0.0.0.0:8000
+# or simply `python asgi.py`. Flask views run on Hypercorn's thread pool while
+# outbound Slack calls are awaited on the shared aiohttp loop (app/slack_async_manager.py).
+import asyncio
+import os
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from app import create_app
+from app.logger import log
+from app.slack_async_manager import close_async_session
+
+flask_app = create_app()
+app = AsyncioWSGIMiddleware(flask_app, max_body_size=flask_app.config['ASGI_MAX_BODY_BYTES'])
+
+if __name__ == "__main__":
+    config = Config()
+    config.bind = [os.getenv("HYPERCORN_BIND", "0.0.0.0:8000")]
+    config.keep_alive_timeout = float(os.getenv("HYPERCORN_KEEP_ALIVE", "75"))
+    log.info("Starting Hypercorn on %s...", ", ".join(config.bind))
+    try:
+        asyncio.run(serve(app, config))
+    finally:
+        close_async_session()
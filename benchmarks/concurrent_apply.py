@@ -0,0 +1,130 @@
+# benchmarks/concurrent_apply.py
+# Fires apply_leave (and cancel_leave_request) from many threads at the same few users and fails (exit 1)
+# if any balance goes negative, two active leaves overlap, or a balance disagrees with the leaves booked.
+#   python benchmarks/concurrent_apply.py [--threads 32] [--attempts 400] [--database-url URL]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from app.models import db, User, ManagerMapping, LeaveRequest, LeaveStatus
+from app.db_manager import init_engine_profiles, configure_engines
+from app import digest_manager, slack_delivery_manager
+from app.intern import apply_leave, cancel_leave_request
+from app.business_day_manager import count_business_days
+from app.user_manager import is_balance_stale, reset_leave_balances
+
+ACTIVE = (LeaveStatus.PENDING, LeaveStatus.APPROVED)
+
+def build_app(database_url, threads):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Same engine profile as the app (WAL, busy timeout, pool sizing), with room for a long queue of writers
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = 30000
+    app.config['DB_POOL_SIZE'] = threads
+    init_engine_profiles(app)
+    db.init_app(app)
+    configure_engines(app, db)
+    return app
+
+def seed(users):
+    db.create_all()
+    db.session.add(User(slack_id="M0", name="M0", role="Manager", leave_balance=14))
+    for slack_id, role in users:
+        db.session.add(User(slack_id=slack_id, name=slack_id, role=role,
+                            leave_balance=14 if role == "Manager" else 2))
+        db.session.add(ManagerMapping(employee_id=slack_id, manager_id="M0"))
+    db.session.commit()
+    for user in User.query.all():
+        if is_balance_stale(user):
+            reset_leave_balances()
+            break
+
+def business_days_this_month():
+    first = date.today().replace(day=1)
+    days = [first + timedelta(days=offset) for offset in range(28)]
+    return [day for day in days if day.weekday() < 5]
+
+def worker(app, users, attempts, results, lock):
+    rng = random.Random()
+    days = business_days_this_month()
+    with app.app_context():
+        for _ in range(attempts):
+            slack_id, _ = rng.choice(users)
+            if rng.random() < 0.2:
+                leave = LeaveRequest.query.filter_by(user_id=slack_id, status=LeaveStatus.PENDING).first()
+                reply = cancel_leave_request(slack_id, leave.id) if leave else "skipped"
+                outcome = "cancelled" if "cancelled successfully" in reply else "cancel_rejected"
+            else:
+                start = rng.choice(days)
+                end = min(start + timedelta(days=rng.randint(0, 2)), days[-1])
+                reply = apply_leave(slack_id, start.isoformat(), end.isoformat(), "stress", slack_id)
+                outcome = "applied" if reply.startswith("Leave applied") else "apply_rejected"
+            if reply.startswith("An error occurred"):
+                outcome = "error"
+            db.session.remove()
+            with lock:
+                results[outcome] = results.get(outcome, 0) + 1
+                if outcome == "error":
+                    results.setdefault("errors", []).append(reply)
+
+def check_invariants(users):
+    violations = []
+    for slack_id, role in users:
+        user = User.query.filter_by(slack_id=slack_id).one()
+        if user.leave_balance < 0:
+            violations.append(f"{slack_id}: negative balance {user.leave_balance}")
+        active = LeaveRequest.query.filter(LeaveRequest.user_id == slack_id,
+                                           LeaveRequest.status.in_(ACTIVE)).order_by(LeaveRequest.start_date).all()
+        for previous, current in zip(active, active[1:]):
+            if current.start_date <= previous.end_date:
+                violations.append(f"{slack_id}: leaves {previous.id} and {current.id} overlap")
+        booked = sum(count_business_days(leave.start_date, leave.end_date) for leave in active)
+        allowance = 14 if role == "Manager" else 2
+        if booked + user.leave_balance != allowance:
+            violations.append(f"{slack_id}: {booked} days booked but balance is {user.leave_balance} of {allowance}")
+    return violations
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--attempts', type=int, default=400, help="operations per thread")
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--database-url', default=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'concurrent.db')}")
+    args = parser.parse_args()
+
+    # Slack notifications are irrelevant here; run them as no-ops instead of queueing real calls
+    digest_manager.enqueue_delivery = slack_delivery_manager.enqueue_delivery = lambda *args, **kwargs: None
+
+    users = [(f"U{index}", "Manager" if index % 2 else "Intern") for index in range(args.users)]
+    app = build_app(args.database_url, args.threads)
+    with app.app_context():
+        db.drop_all()
+        seed(users)
+
+    results, lock = {}, threading.Lock()
+    threads = [threading.Thread(target=worker, args=(app, users, args.attempts, results, lock))
+               for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        violations = check_invariants(users)
+    for error in results.pop("errors", [])[:5]:
+        print(f"error: {error}")
+    print(", ".join(f"{name}={count}" for name, count in sorted(results.items())))
+    for violation in violations:
+        print(f"VIOLATION {violation}")
+    return 1 if violations or results.get("error") else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# benchmarks/fake_slack.py
+# Local stand-in for the Slack Web API so the app can be load-tested offline. Point the app at it with
+# SLACK_API_URL=http://127.0.0.1:<port>/api/ ; GET /_stats returns calls per method, POST /_reset clears them.
+#   python benchmarks/fake_slack.py --port 8765 --latency-ms 40 --jitter-ms 20 --rate-limit 0.02
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeSlack:
+    """Canned Web API responses with configurable latency and a share of 429s."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, rate_limit=0.0, retry_after=1, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self.lock = threading.Lock()
+        self.ts = 1700000000.0
+
+    def next_ts(self):
+        with self.lock:
+            self.ts += 0.000001
+            return f"{self.ts:.6f}"
+
+    def handle(self, method, body):
+        """Returns (status, headers, payload) for one API call."""
+        with self.lock:
+            self.calls[method] += 1
+            limited = self.rate_limit and self.random.random() < self.rate_limit
+            if limited:
+                self.rate_limited[method] += 1
+            delay = max(self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        if delay:
+            time.sleep(delay)
+        if limited:
+            return 429, {'Retry-After': str(self.retry_after)}, {'ok': False, 'error': 'ratelimited'}
+        channel = body.get('channel') or 'D' + str(body.get('users', 'FAKE'))[:10]
+        if method == 'chat.postMessage':
+            return 200, {}, {'ok': True, 'channel': channel, 'ts': self.next_ts(), 'message': {'text': body.get('text')}}
+        if method == 'chat.update':
+            return 200, {}, {'ok': True, 'channel': channel, 'ts': body.get('ts') or self.next_ts()}
+        if method in ('views.publish', 'views.open', 'views.update'):
+            view = dict(body.get('view') or {})
+            view.update({'id': 'V' + self.next_ts().replace('.', ''), 'hash': self.next_ts()})
+            return 200, {}, {'ok': True, 'view': view}
+        if method == 'conversations.open':
+            return 200, {}, {'ok': True, 'channel': {'id': channel}}
+        if method == 'users.info':
+            user_id = body.get('user', 'UFAKE')
+            return 200, {}, {'ok': True, 'user': fake_user(user_id)}
+        if method == 'users.list':
+            return 200, {}, {'ok': True, 'members': [], 'response_metadata': {'next_cursor': ''}}
+        return 200, {}, {'ok': True}
+
+    def stats(self):
+        with self.lock:
+            return {'calls': dict(self.calls), 'rate_limited': dict(self.rate_limited)}
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+            self.rate_limited.clear()
+
+def fake_user(user_id):
+    return {'id': user_id, 'name': user_id.lower(), 'real_name': f"User {user_id}",
+            'profile': {'real_name': f"User {user_id}"}, 'is_bot': False, 'deleted': False}
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, headers, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            if not raw:
+                return {}
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                return json.loads(raw)
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/_stats':
+                return self._send(200, {}, fake.stats())
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            self._send(*fake.handle(url.path.rsplit('/', 1)[-1], query))
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path == '/_reset':
+                fake.reset()
+                return self._send(200, {}, {'ok': True})
+            self._send(*fake.handle(url.path.rsplit('/', 1)[-1], self._body()))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def start_fake_slack(port=0, **options):
+    """Serves a FakeSlack on a daemon thread. Returns (server, fake); server.server_port is the bound port."""
+    fake = FakeSlack(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-slack", daemon=True).start()
+    return server, fake
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=40)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--rate-limit', type=float, default=0, help="share of calls answered with 429 (0-1)")
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+    server, _ = start_fake_slack(args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                 rate_limit=args.rate_limit, retry_after=args.retry_after)
+    print(f"Fake Slack API on http://127.0.0.1:{server.server_port}/api/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/leave_queries.py
+# Times the hot leave queries against a seeded database, with and without the model indexes.
+#   python benchmarks/leave_queries.py --rows 100000 --users 2000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from sqlalchemy import or_, text
+from app.models import db, User, ManagerMapping, LeaveRequest, LeaveStatus, ensure_indexes
+
+def build_app(database_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed(users, managers, rows):
+    manager_ids = [f"M{i:05d}" for i in range(managers)]
+    user_ids = [f"U{i:06d}" for i in range(users)]
+    db.session.bulk_insert_mappings(User, [
+        {"slack_id": slack_id, "name": slack_id, "role": "Manager", "leave_balance": 14, "last_reset_month": "2024"}
+        for slack_id in manager_ids
+    ] + [
+        {"slack_id": slack_id, "name": slack_id, "role": "Intern", "leave_balance": 2, "last_reset_month": "2024-01"}
+        for slack_id in user_ids
+    ])
+    mapping = {slack_id: manager_ids[index % managers] for index, slack_id in enumerate(user_ids)}
+    db.session.bulk_insert_mappings(ManagerMapping, [
+        {"employee_id": slack_id, "manager_id": manager_id} for slack_id, manager_id in mapping.items()
+    ])
+    statuses = list(LeaveStatus)
+    first_day = date(2020, 1, 1)
+    batch = []
+    for _ in range(rows):
+        slack_id = random.choice(user_ids)
+        start_date = first_day + timedelta(days=random.randint(0, 365 * 5))
+        batch.append({
+            "user_id": slack_id,
+            "manager_id": mapping[slack_id],
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=random.randint(0, 3)),
+            "reason": "benchmark",
+            "status": random.choice(statuses)
+        })
+        if len(batch) == 10000:
+            db.session.bulk_insert_mappings(LeaveRequest, batch)
+            batch = []
+    if batch:
+        db.session.bulk_insert_mappings(LeaveRequest, batch)
+    db.session.commit()
+    return user_ids, manager_ids
+
+def scenarios(user_ids, manager_ids):
+    window_start = date(2022, 6, 1)
+    window_end = date(2022, 6, 5)
+    return {
+        "overlap check (user, dates)": lambda: LeaveRequest.query.filter(
+            LeaveRequest.user_id == random.choice(user_ids),
+            LeaveRequest.start_date <= window_end,
+            LeaveRequest.end_date >= window_start,
+            LeaveRequest.status.notin_([LeaveStatus.CANCELLED, LeaveStatus.DECLINED])
+        ).all(),
+        "pending for user (user, status)": lambda: LeaveRequest.query.filter_by(
+            user_id=random.choice(user_ids), status=LeaveStatus.PENDING
+        ).all(),
+        "pending for manager (manager, status)": lambda: LeaveRequest.query.filter_by(
+            manager_id=random.choice(manager_ids), status=LeaveStatus.PENDING
+        ).all(),
+        "calendar events (user or manager)": lambda: LeaveRequest.query.filter(
+            or_(LeaveRequest.user_id == random.choice(manager_ids), LeaveRequest.manager_id == random.choice(manager_ids))
+        ).filter(LeaveRequest.status.in_([LeaveStatus.APPROVED, LeaveStatus.PENDING])).all(),
+        "manager mapping lookup": lambda: ManagerMapping.query.filter_by(employee_id=random.choice(user_ids)).first(),
+    }
+
+def run(queries, iterations):
+    results = {}
+    for name, query in queries.items():
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+            db.session.expunge_all()
+        timings.sort()
+        results[name] = (timings[len(timings) // 2], timings[int(len(timings) * 0.99) - 1])
+    return results
+
+def drop_indexes():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            db.session.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--managers', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    app = build_app(database_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        random.seed(7)
+        started = time.perf_counter()
+        user_ids, manager_ids = seed(args.users, args.managers, args.rows)
+        print(f"Seeded {args.rows} leave rows in {time.perf_counter() - started:.1f}s ({database_url})")
+        queries = scenarios(user_ids, manager_ids)
+
+        drop_indexes()
+        without = run(queries, args.iterations)
+        ensure_indexes()
+        with_indexes = run(queries, args.iterations)
+
+    print(f"{'query':40} {'p50 no-ix':>10} {'p50 ix':>10} {'p99 no-ix':>10} {'p99 ix':>10}  (ms)")
+    for name in queries:
+        print(f"{name:40} {without[name][0]:10.3f} {with_indexes[name][0]:10.3f} {without[name][1]:10.3f} {with_indexes[name][1]:10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/load_scenarios.py
+# Offline load test: seeds a database, serves the app on a local threaded server with Slack replaced by
+# benchmarks/fake_slack.py, then runs scripted scenarios and reports p50/p99 latency and throughput per endpoint.
+#   python benchmarks/load_scenarios.py --users 2000 --concurrency 32 --requests 1000 --slack-latency-ms 40
+#   python benchmarks/load_scenarios.py --scenarios calendar --app-url http://127.0.0.1:5000 --no-seed ...
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fake_slack import start_fake_slack
+from seed_data import manager_ids, user_ids
+
+SCENARIOS = ('slash', 'home', 'calendar')
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def sign_slack_request(prepared, secret):
+    """Adds the X-Slack-Signature headers Slack would send (v0 HMAC-SHA256 of "v0:<timestamp>:<body>")."""
+    timestamp = str(int(time.time()))
+    body = prepared.body or b''
+    if isinstance(body, str):
+        body = body.encode()
+    digest = hmac.new(secret.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256).hexdigest()
+    prepared.headers['X-Slack-Request-Timestamp'] = timestamp
+    prepared.headers['X-Slack-Signature'] = f"v0={digest}"
+
+def slash_requests(args, rng):
+    """Slash-command storm: balance, history, pending and apply commands from random interns."""
+    interns = user_ids(args.users)
+    for _ in range(args.requests):
+        user_id = rng.choice(interns)
+        command = rng.choices(['/leavebalance', '/pastleaves', '/pendingleave', '/applyleave'], [3, 3, 2, 2])[0]
+        text = ''
+        if command == '/applyleave':
+            start = date.today() + timedelta(days=rng.randrange(60, 400))
+            text = f"{start} {start} load test"
+        form = {'command': command, 'user_id': user_id, 'user_name': user_id, 'text': text}
+        yield f"POST /slack/leave {command}", 'POST', '/slack/leave', {'data': form}
+
+def home_requests(args, rng):
+    """Home-tab open storm: app_home_opened events from interns and managers, each a distinct delivery."""
+    people = user_ids(args.users) + manager_ids(args.managers) * 5
+    for _ in range(args.requests):
+        event = {'event_id': f"Ev{uuid.uuid4().hex}", 'type': 'event_callback',
+                 'event': {'type': 'app_home_opened', 'user': rng.choice(people), 'tab': 'home'}}
+        yield "POST /slack/apps_home", 'POST', '/slack/apps_home', {'json': event}
+
+def calendar_requests(args, rng):
+    """Calendar browsing: managers paging through months, revisiting some with If-None-Match, plus analytics."""
+    managers = manager_ids(args.managers)
+    for _ in range(args.requests):
+        manager_id = rng.choice(managers)
+        if rng.random() < 0.1:
+            yield "GET /api/analytics", 'GET', f"/api/analytics/{manager_id}", {}
+            continue
+        month = (date.today().replace(day=1) - timedelta(days=31 * rng.randrange(12))).replace(day=1)
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        path = f"/api/leave-events/{manager_id}?start={month}&end={next_month}"
+        yield "GET /api/leave-events", 'GET', path, {'revalidate': True}
+
+def run_scenario(name, base_url, args):
+    rng = random.Random(f"{args.seed}-{name}")
+    jobs = list({'slash': slash_requests, 'home': home_requests, 'calendar': calendar_requests}[name](args, rng))
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'unauthorized': 0, 'not_modified': 0})
+    results_lock = threading.Lock()
+    local = threading.local()
+    etags = {}
+
+    def call(job):
+        label, method, path, options = job
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        headers = {}
+        if options.pop('revalidate', False) and path in etags:
+            headers['If-None-Match'] = etags[path]
+        prepared = session.prepare_request(requests.Request(method, base_url + path, headers=headers, **options))
+        if args.signing_secret and path.startswith('/slack/'):
+            sign_slack_request(prepared, args.signing_secret)
+        started = time.perf_counter()
+        try:
+            response = session.send(prepared, timeout=30)
+            status = response.status_code
+            if response.headers.get('ETag'):
+                etags[path] = response.headers['ETag']
+        except requests.RequestException:
+            status = None
+        elapsed = time.perf_counter() - started
+        with results_lock:
+            result = results[label]
+            result['latencies'].append(elapsed)
+            # Any 4xx counts: a 401 from signature checks or a 400 would otherwise pass as a fast success
+            if status is None or status >= 400:
+                result['errors'] += 1
+            if status == 401:
+                result['unauthorized'] += 1
+            elif status == 304:
+                result['not_modified'] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(call, jobs))
+    wall = time.perf_counter() - started
+    report = {}
+    for label, result in sorted(results.items()):
+        latencies = result['latencies']
+        report[label] = {
+            'requests': len(latencies),
+            'errors': result['errors'],
+            'unauthorized': result['unauthorized'],
+            'not_modified': result['not_modified'],
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'throughput_rps': round(len(latencies) / wall, 1),
+        }
+    return report, wall
+
+def start_app(args, slack_url):
+    """Serves create_app() on a local threaded WSGI server. Env is set first because config.py reads it at import."""
+    os.environ.update({
+        'DATABASE_URL': args.database_url,
+        'SLACK_API_URL': slack_url,
+        'SLACK_BOT_TOKEN': os.getenv('SLACK_BOT_TOKEN', 'xoxb-load-test'),
+        'RUN_BOOTSTRAP_ON_STARTUP': '0',
+        'DIRECTORY_REFRESH_INTERVAL': '0',
+        'BALANCE_RESET_INTERVAL': '0',
+        'CALENDAR_URL': 'http://127.0.0.1',
+        'SLACK_RATE_LIMIT_SCALE': str(args.slack_limit_scale),
+        'SLACK_SIGNING_SECRET': args.signing_secret,
+        'SLACK_VERIFY_SIGNATURES': '1' if args.signing_secret else '0',
+    })
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import create_app
+    from app.logger import log
+    from app.models import db
+    from seed_data import seed
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    # Per-request INFO lines would cost more than some of the handlers being measured
+    log.setLevel(logging.WARNING)
+    app = create_app()
+    if not args.no_seed:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            counts = seed(args.users, args.managers, args.leaves_per_user, seed_value=args.seed)
+        print(f"Seeded {counts}")
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="load-app", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+def wait_for_deliveries(timeout=120):
+    """Waits for the in-process Slack delivery queue to empty. Returns the seconds it took, or None on timeout."""
+    from app.slack_delivery_manager import get_delivery_metrics
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        metrics = get_delivery_metrics()
+        # Inline fallbacks count as completed/failed without ever being enqueued
+        if metrics["enqueued"] <= metrics["completed"] + metrics["failed"] - metrics["ran_inline"]:
+            return time.perf_counter() - started
+        time.sleep(0.05)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=500, help="requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--managers', type=int, default=25)
+    parser.add_argument('--leaves-per-user', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url', default=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}")
+    parser.add_argument('--no-seed', action='store_true', help="reuse an already seeded --database-url")
+    parser.add_argument('--app-url', help="load an already running app instead of serving one in-process")
+    parser.add_argument('--slack-url', help="use an already running fake Slack instead of starting one")
+    parser.add_argument('--slack-latency-ms', type=float, default=40)
+    parser.add_argument('--slack-jitter-ms', type=float, default=10)
+    parser.add_argument('--slack-rate-limit', type=float, default=0.0, help="share of Slack calls answered with 429")
+    parser.add_argument('--slack-limit-scale', type=float, default=1000,
+                        help="multiplier on the app's own per-method Slack limits; 1 reproduces production pacing")
+    parser.add_argument('--signing-secret', default='load-test-signing-secret',
+                        help="signs /slack/* requests like Slack does; must match the app's SLACK_SIGNING_SECRET. "
+                             "An empty value turns verification off")
+    parser.add_argument('--output', help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    fake = None
+    slack_url = args.slack_url
+    if not slack_url:
+        server, fake = start_fake_slack(latency_ms=args.slack_latency_ms, jitter_ms=args.slack_jitter_ms,
+                                        rate_limit=args.slack_rate_limit, seed=args.seed)
+        slack_url = f"http://127.0.0.1:{server.server_port}/api/"
+    base_url = args.app_url or start_app(args, slack_url)
+
+    report = {}
+    for name in args.scenarios.split(','):
+        if fake:
+            fake.reset()
+        endpoints, wall = run_scenario(name.strip(), base_url, args)
+        report[name] = {'seconds': round(wall, 2), 'endpoints': endpoints}
+        if not args.app_url:
+            # Slack calls run on background delivery workers after the HTTP response; count them against this scenario
+            drained = wait_for_deliveries()
+            report[name]['delivery_drain_seconds'] = round(drained, 2) if drained is not None else None
+        if fake:
+            report[name]['slack'] = fake.stats()
+        print(f"\n== {name}: {args.requests} requests in {wall:.2f}s at concurrency {args.concurrency}")
+        print(f"{'endpoint':42} {'n':>6} {'err':>5} {'401':>5} {'304':>5} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+        for label, row in endpoints.items():
+            print(f"{label:42} {row['requests']:>6} {row['errors']:>5} {row['unauthorized']:>5} {row['not_modified']:>5} "
+                  f"{row['p50_ms']:>9} {row['p99_ms']:>9} {row['throughput_rps']:>8}")
+        if 'delivery_drain_seconds' in report[name]:
+            print(f"deliveries drained {report[name]['delivery_drain_seconds']}s after the last response")
+        if fake:
+            print(f"slack calls: {report[name]['slack']['calls']}  429s: {report[name]['slack']['rate_limited']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/query_counts.py
+# Fails (exit 1) when a view's SQL statement count grows with the number of rows it renders.
+#   python benchmarks/query_counts.py
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from app.models import db, User, ManagerMapping, LeaveRequest, LeaveStatus
+from app.query_manager import assert_max_queries
+from app import routes, slack_modal_manager
+from app.manager import view_all_pending_leaves_ui, view_all_pending_leaves
+
+def build_app():
+    app = Flask(__name__, template_folder=os.path.join(os.path.dirname(routes.__file__), 'templates'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'counts.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(routes.bp)
+    return app
+
+def seed(manager_id, team_size):
+    db.session.add(User(slack_id=manager_id, name=manager_id, role="Manager", leave_balance=14))
+    for index in range(team_size):
+        slack_id = f"{manager_id}-U{index}"
+        db.session.add(User(slack_id=slack_id, name=slack_id, role="Intern"))
+        db.session.add(ManagerMapping(employee_id=slack_id, manager_id=manager_id))
+        start_date = date(2024, 1, 1) + timedelta(days=index)
+        for status in (LeaveStatus.PENDING, LeaveStatus.APPROVED):
+            db.session.add(LeaveRequest(user_id=slack_id, manager_id=manager_id, start_date=start_date,
+                                        end_date=start_date, reason="check", status=status))
+    db.session.commit()
+
+def main():
+    app = build_app()
+    slack_modal_manager.slack_post_async = lambda *args, **kwargs: None
+    budgets = {
+        "view_all_pending_leaves_ui": (3, lambda manager_id, client: view_all_pending_leaves_ui(manager_id)),
+        "view_all_pending_leaves": (3, lambda manager_id, client: view_all_pending_leaves()),
+        "get_leave_events": (3, lambda manager_id, client: client.get(f"/api/leave-events/{manager_id}")),
+        "open_intern_users_modal": (3, lambda manager_id, client: slack_modal_manager.open_intern_users_modal("trigger", manager_id)),
+    }
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        seed("MSMALL", 2)
+        seed("MLARGE", 50)
+        client = app.test_client()
+        for name, (limit, view) in budgets.items():
+            counts = []
+            for manager_id in ("MSMALL", "MLARGE"):
+                db.session.expunge_all()
+                try:
+                    with assert_max_queries(limit) as counter:
+                        view(manager_id, client)
+                except AssertionError as e:
+                    failures += 1
+                    print(f"FAIL {name} ({manager_id}): {str(e).splitlines()[0]}")
+                counts.append(counter.count)
+            print(f"{name:30} queries small={counts[0]} large={counts[1]} budget={limit}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
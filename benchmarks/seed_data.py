@@ -0,0 +1,96 @@
+# benchmarks/seed_data.py
+# Seeds a database with N users spread over managers, their mappings and non-overlapping leave history,
+# then rebuilds the analytics rollup and team coverage index so every read path has data.
+#   python benchmarks/seed_data.py --database-url sqlite:////tmp/load.db --users 2000 --managers 50 --leaves-per-user 25
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from app.models import db, User, ManagerMapping, LeaveRequest, LeaveStatus
+from app.color_manager import color_for_index
+from app.analytics_manager import rebuild_leave_rollups
+from app.coverage_manager import rebuild_team_coverage
+
+BATCH_SIZE = 5000
+
+def manager_ids(managers):
+    return [f"M{index:05d}" for index in range(managers)]
+
+def user_ids(users):
+    return [f"U{index:06d}" for index in range(users)]
+
+def _flush(model, rows):
+    if rows:
+        db.session.bulk_insert_mappings(model, rows)
+        rows.clear()
+
+def seed(users, managers, leaves_per_user, today=None, seed_value=0):
+    """Inserts the data set into the current app's database. Returns the row counts written."""
+    rng = random.Random(seed_value)
+    today = today or date.today()
+    month = today.strftime('%Y-%m')
+    rows = []
+    for index, slack_id in enumerate(manager_ids(managers)):
+        rows.append({'slack_id': slack_id, 'name': f"Manager {index}", 'role': 'Manager', 'leave_balance': 14,
+                     'last_reset_month': today.strftime('%Y'), 'is_admin': index == 0, 'color': color_for_index(index)})
+    for index, slack_id in enumerate(user_ids(users)):
+        rows.append({'slack_id': slack_id, 'name': f"Intern {index}", 'role': 'Intern', 'leave_balance': 2,
+                     'last_reset_month': month, 'is_admin': False, 'color': color_for_index(managers + index)})
+    _flush(User, rows)
+    mappings = [{'employee_id': slack_id, 'manager_id': f"M{index % managers:05d}"}
+                for index, slack_id in enumerate(user_ids(users))]
+    db.session.bulk_insert_mappings(ManagerMapping, mappings)
+
+    # Walk each user's history forward from a couple of years back: short leaves a few weeks apart, never overlapping
+    history_start = today - timedelta(days=730)
+    leave_count = 0
+    for index, slack_id in enumerate(user_ids(users)):
+        day = history_start + timedelta(days=rng.randrange(14))
+        for _ in range(leaves_per_user):
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            end = day + timedelta(days=rng.randrange(2))
+            if end > today + timedelta(days=60):
+                break
+            status = LeaveStatus.PENDING if end >= today else rng.choices(
+                [LeaveStatus.APPROVED, LeaveStatus.DECLINED, LeaveStatus.CANCELLED], [8, 1, 1])[0]
+            rows.append({'user_id': slack_id, 'manager_id': f"M{index % managers:05d}", 'start_date': day,
+                         'end_date': end, 'reason': "Seeded", 'status': status})
+            leave_count += 1
+            if len(rows) >= BATCH_SIZE:
+                _flush(LeaveRequest, rows)
+            day = end + timedelta(days=rng.randrange(10, 40))
+    _flush(LeaveRequest, rows)
+    db.session.commit()
+    rebuild_leave_rollups()
+    rebuild_team_coverage()
+    return {'users': users + managers, 'mappings': len(mappings), 'leave_requests': leave_count}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--managers', type=int, default=25)
+    parser.add_argument('--leaves-per-user', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    started = time.perf_counter()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        counts = seed(args.users, args.managers, args.leaves_per_user, seed_value=args.seed)
+    print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
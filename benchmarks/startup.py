@@ -0,0 +1,63 @@
+# benchmarks/startup.py
+# Guards worker cold start: measures `import app` and create_app() in fresh interpreters with
+# RUN_BOOTSTRAP_ON_STARTUP=0 and fails (exit 1) if create_app is over budget or touches Slack.
+#   python benchmarks/startup.py --runs 5 --budget-ms 150
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+from app import slack_http_manager
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "slack_calls": slack_http_manager.get_slack_http_metrics()["calls"],
+    "http_session": slack_http_manager._session is not None
+}))
+"""
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=150)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": ROOT,
+        "RUN_BOOTSTRAP_ON_STARTUP": "0",
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}",
+        "SLACK_API_URL": "http://127.0.0.1:9/api/",
+    })
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], env=env, cwd=tempfile.gettempdir(),
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(sample["import_ms"] for sample in samples)
+    create_ms = statistics.median(sample["create_ms"] for sample in samples)
+    print(f"import app: {import_ms:.1f}ms  create_app: {create_ms:.1f}ms  (median of {args.runs})")
+    failures = []
+    if create_ms > args.budget_ms:
+        failures.append(f"create_app took {create_ms:.1f}ms, budget is {args.budget_ms:.0f}ms")
+    if any(sample["slack_calls"] or sample["http_session"] for sample in samples):
+        failures.append("create_app opened a Slack connection")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -2,3 +2,56 @@ import os
 
 SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///leavebot.db')
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+SLACK_DELIVERY_WORKERS = int(os.getenv('SLACK_DELIVERY_WORKERS', '4'))
+SLACK_DELIVERY_QUEUE_SIZE = int(os.getenv('SLACK_DELIVERY_QUEUE_SIZE', '1000'))
+SLACK_DELIVERY_PUT_TIMEOUT = float(os.getenv('SLACK_DELIVERY_PUT_TIMEOUT', '0.5'))
+
+# Seconds between leave balance reset passes, 0 disables the in-process scheduler
+BALANCE_RESET_INTERVAL = int(os.getenv('BALANCE_RESET_INTERVAL', '3600'))
+
+# Company holidays, one YYYY-MM-DD per line; read by app/business_day_manager.py
+HOLIDAYS_FILE = os.getenv('HOLIDAYS_FILE', 'holidays.txt')
+
+# Seconds between full users.list syncs of the Slack directory cache, 0 disables
+DIRECTORY_REFRESH_INTERVAL = int(os.getenv('DIRECTORY_REFRESH_INTERVAL', '21600'))
+
+# Bearer token for the admin HTTP API (bulk leave import/export); unset disables those endpoints
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN')
+# Largest request body asgi.py's WSGI bridge buffers, sized for /api/leaves/import uploads (Hypercorn's default is
+# 64 KiB). The bridge holds the whole body in memory, so very large files are better loaded with `flask import-leaves`
+ASGI_MAX_BODY_BYTES = int(os.getenv('ASGI_MAX_BODY_BYTES', str(64 * 1024 * 1024)))
+
+# Set to 0 on multi-worker deployments and run `flask bootstrap` once instead, so workers start without network or table scans
+RUN_BOOTSTRAP_ON_STARTUP = os.getenv('RUN_BOOTSTRAP_ON_STARTUP', '1') == '1'
+
+# Team members who must stay on duty; the manager's leave notification warns when an approval would leave fewer
+MIN_TEAM_ON_DUTY = int(os.getenv('MIN_TEAM_ON_DUTY', '1'))
+
+# Engine profiles (app/db_manager.py). SQLite gets WAL so readers never block the single writer, and a busy timeout
+# so writers queue for the lock; other databases get a sized, pre-pinged connection pool
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+
+# Optional read replica for the calendar feed, leave history and home tab; reads fall back to the primary while it lags
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+
+# Slack app signing secret; /slack/* requests without a valid, fresh X-Slack-Signature (or without a Content-Length)
+# get a 401 before their body is parsed. While it is unset every /slack/* request is rejected, unless verification is
+# switched off with SLACK_VERIFY_SIGNATURES=0 (local development only)
+SLACK_SIGNING_SECRET = os.getenv('SLACK_SIGNING_SECRET')
+SLACK_VERIFY_SIGNATURES = os.getenv('SLACK_VERIFY_SIGNATURES', '1') != '0'
+SLACK_SIGNATURE_MAX_AGE = int(os.getenv('SLACK_SIGNATURE_MAX_AGE', '300'))
+SLACK_MAX_BODY_BYTES = int(os.getenv('SLACK_MAX_BODY_BYTES', '1048576'))
+
+# Seconds between leave digest runs for managers in digest mode (/leavedigest on), 0 disables the in-process scheduler;
+# a digest also goes out as soon as DIGEST_MAX_SIZE requests are queued for a manager
+DIGEST_INTERVAL = int(os.getenv('DIGEST_INTERVAL', '3600'))
+DIGEST_MAX_SIZE = int(os.getenv('DIGEST_MAX_SIZE', '10'))
+# Seconds after which a digest batch claimed by a sender that never posted it (e.g. a killed worker) is queued again
+DIGEST_CLAIM_TIMEOUT = int(os.getenv('DIGEST_CLAIM_TIMEOUT', '600'))